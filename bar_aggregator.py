@@ -0,0 +1,98 @@
+from collections import deque
+from market_data_store import to_epoch_seconds, from_epoch_seconds
+
+TIMEFRAME_SECONDS = {"1min": 60, "5min": 300, "15min": 900, "30min": 1800, "60min": 3600, "1day": 86400}
+
+
+class BarAggregator:
+    """Build higher-timeframe OHLCV bars incrementally from the ingested 1-minute stream.
+
+    Each bar is a dict with ``start`` (epoch seconds), ``open``, ``high``, ``low``, ``close``
+    and ``volume``. A bar completes once a 1-minute bar for a later bucket arrives; the bar
+    still being built is kept separately and can be included on request. Only the last
+    ``max_bars`` completed bars per symbol and timeframe are kept.
+    """
+
+    def __init__(self, timeframes=("5min", "15min", "60min", "1day"), max_bars=500):
+        unknown = [timeframe for timeframe in timeframes if timeframe not in TIMEFRAME_SECONDS]
+        if unknown:
+            raise ValueError(f"Unsupported timeframes: {unknown}")
+        self.timeframes = tuple(timeframes)
+        self.max_bars = max_bars
+        self._completed = {}
+        self._current = {}
+        self._last_timestamp = {}
+
+    def add_bar(self, symbol, timestamp, close, volume, open_price=None, high=None, low=None):
+        """Fold one 1-minute bar into every timeframe and return the ``(timeframe, bar)`` pairs it completed."""
+        seconds = to_epoch_seconds(timestamp) if isinstance(timestamp, str) else int(timestamp)
+        if self._last_timestamp.get(symbol, -1) >= seconds:
+            return []
+        self._last_timestamp[symbol] = seconds
+        open_price = close if open_price is None else open_price
+        high = max(open_price, close) if high is None else high
+        low = min(open_price, close) if low is None else low
+
+        completed = []
+        for timeframe in self.timeframes:
+            start = seconds - seconds % TIMEFRAME_SECONDS[timeframe]
+            key = (symbol, timeframe)
+            bar = self._current.get(key)
+            if bar is not None and bar["start"] != start:
+                self._completed_bars(key).append(bar)
+                completed.append((timeframe, bar))
+                bar = None
+            if bar is None and self._completed.get(key) and self._completed[key][-1]["start"] == start:
+                # Keep building a seeded bar for the bucket still in progress instead of completing it twice
+                bar = self._current[key] = self._completed[key].pop()
+            if bar is None:
+                self._current[key] = {"start": start, "open": open_price, "high": high, "low": low, "close": close, "volume": volume}
+            else:
+                bar["high"] = max(bar["high"], high)
+                bar["low"] = min(bar["low"], low)
+                bar["close"] = close
+                bar["volume"] += volume
+        return completed
+
+    def seed(self, symbol, timeframe, data, volumes):
+        """Preload completed bars from fetched history (``(price, timestamp)`` pairs, as fetch_initial_data returns).
+
+        History for a timeframe this aggregator does not build is ignored.
+        """
+        if timeframe not in self.timeframes:
+            return
+        bars = self._completed_bars((symbol, timeframe))
+        last_start = bars[-1]["start"] if bars else None
+        for (price, timestamp), volume in zip(data, volumes):
+            start = to_epoch_seconds(timestamp)
+            start -= start % TIMEFRAME_SECONDS[timeframe]
+            if last_start is None or start > last_start:
+                bars.append({"start": start, "open": price, "high": price, "low": price, "close": price, "volume": volume})
+                last_start = start
+
+    def has_symbol(self, symbol):
+        """Whether any bar of ``symbol`` has been seeded or added yet."""
+        return symbol in self._last_timestamp or any(key[0] == symbol for key in self._completed)
+
+    def _completed_bars(self, key):
+        if key not in self._completed:
+            self._completed[key] = deque(maxlen=self.max_bars)
+        return self._completed[key]
+
+    def bars(self, symbol, timeframe, include_partial=False):
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Timeframe {timeframe} is not aggregated, only {self.timeframes}")
+        bars = list(self._completed.get((symbol, timeframe), ()))
+        current = self._current.get((symbol, timeframe))
+        if include_partial and current is not None and (not bars or current["start"] > bars[-1]["start"]):
+            bars.append(current)
+        return bars
+
+    def closes(self, symbol, timeframe, include_partial=True):
+        """Closing prices for RSI, by default including the still-forming bar as the latest price."""
+        return [bar["close"] for bar in self.bars(symbol, timeframe, include_partial)]
+
+    def history(self, symbol, timeframe, include_partial=False):
+        """Bars in the ``(historical_data, volumes)`` shape returned by GetMarketData.fetch_initial_data."""
+        bars = self.bars(symbol, timeframe, include_partial)
+        return [(bar["close"], from_epoch_seconds(bar["start"], timeframe)) for bar in bars], [bar["volume"] for bar in bars]
@@ -0,0 +1,220 @@
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+import numpy as np
+from utils import calculate_rsi
+from zone_recovery_logic import ZoneRecoveryLogic
+from get_market_data import GetMarketData
+from bot import ZoneRecoveryBot
+from simulated_broker import SimulatedExchange, SimulatedIBClient, SimulatedAlpacaClient, ReplayMarketData
+from price_paths import generate_paths
+import trading_simulation
+from zone_recovery_kernel import run_kernel
+
+DEFAULT_THRESHOLD = 0.25
+
+
+class RunOnce:
+    """Stand-in for ``ZoneRecoveryBot.running`` that lets ``start`` execute exactly one cycle."""
+
+    def __init__(self):
+        self.checked = False
+
+    def __bool__(self):
+        if self.checked:
+            return False
+        self.checked = True
+        return True
+
+
+def daily_payload(days):
+    closes = generate_paths(1, days, seed=1)[0]
+    start = np.datetime64("2000-01-03")
+    return {"Time Series (Daily)": {str(start + i): {"4. close": f"{close:.4f}", "5. volume": str(1000 + i)} for i, close in enumerate(closes)}}
+
+
+def intraday_payload(minutes):
+    closes = generate_paths(1, minutes, seed=2)[0]
+    start = np.datetime64("2021-01-04T09:30:00")
+    return {"Time Series (1min)": {str(start + np.timedelta64(i, "m")).replace("T", " "): {"4. close": f"{close:.4f}", "5. volume": str(1000 + i)}
+                                   for i, close in enumerate(closes)}}
+
+
+def mocked_response(payload):
+    return MagicMock(json=MagicMock(return_value=payload), raise_for_status=MagicMock())
+
+
+def bench_calculate_rsi(size):
+    prices = list(generate_paths(1, size, seed=3)[0])
+    return lambda: calculate_rsi(prices, 14)
+
+
+def bench_check_profit(legs):
+    logic = ZoneRecoveryLogic(max_trades=legs + 1)
+    prices = list(generate_paths(1, 30, seed=4)[0])
+    positions = [{"price": price, "qty": 10} for price in generate_paths(1, legs, seed=5)[0]] if legs else []
+    stock_data = {"prices": prices, "long": positions[::2], "short": positions[1::2]}
+    return lambda: logic.calculate_rsi_and_check_profit(stock_data, "BENCH", prices[-1])
+
+
+def bench_fetch_initial_data(payload, series):
+    market_data = GetMarketData()
+    response = mocked_response(payload)
+
+    def run():
+        with patch("requests.get", return_value=response):
+            market_data.fetch_initial_data("BENCH", "1min", 10**6, "delayed", series)
+    return run
+
+
+def bench_analyze_trend(days):
+    market_data = GetMarketData()
+    closes = generate_paths(1, days, seed=6)[0]
+    historical_data = [(float(close), str(i)) for i, close in enumerate(closes)]
+    volumes = list(range(1000, 1000 + days))
+    return lambda: market_data.analyze_trend(historical_data, volumes, support_level=0.8, resistance_level=1.2)
+
+
+def bench_bot_cycle(symbols, calls):
+    """Time one bot cycle over fresh state per call, so positions do not pile up across rounds."""
+    # The setup cycle fetches 30 bars of history and consumes the next one; the measured cycle gets the last
+    prices = {f"SYM{i}": path for i, path in enumerate(generate_paths(symbols, 30 + 2, seed=7))}
+    bots = []
+    for _ in range(calls):
+        exchange = SimulatedExchange(seed=1)
+        replay = ReplayMarketData.from_prices(prices, exchange)
+        bot = ZoneRecoveryBot(list(prices), SimulatedIBClient(exchange), SimulatedAlpacaClient(exchange),
+                              market_data_service=replay, scan_candidates=False)
+        bot.data_update_interval = 0
+        bot.running = RunOnce()
+        bot.start()  # initial history fetch, not measured
+        bots.append(bot)
+
+    def run():
+        if not bots:
+            raise RuntimeError("bench_bot_cycle was called more often than the warmup and rounds it was built for")
+        bot = bots.pop()
+        bot.running = RunOnce()
+        bot.start()
+    return run
+
+
+def bench_run_simulation(days):
+    return lambda: trading_simulation.run_simulation(days, seed=8)
+
+
+def bench_kernel(ticks, window):
+    prices = generate_paths(1, ticks, seed=9)[0]
+    return lambda: run_kernel(prices, window=window)
+
+
+def build_benchmarks(scale=1.0, rounds=5, warmup=1):
+    """Map benchmark names to zero-argument callables; ``scale`` shrinks or grows the workloads.
+
+    ``rounds`` and ``warmup`` must match the later run_benchmarks call for benchmarks that
+    prepare fresh state for every call.
+    """
+    def scaled(value):
+        return max(1, int(value * scale))
+    return {
+        "utils.calculate_rsi[30]": bench_calculate_rsi(30),
+        f"utils.calculate_rsi[{scaled(5000)}]": bench_calculate_rsi(scaled(5000)),
+        "logic.calculate_rsi_and_check_profit[legs=0]": bench_check_profit(0),
+        "logic.calculate_rsi_and_check_profit[legs=10]": bench_check_profit(10),
+        "logic.calculate_rsi_and_check_profit[legs=100]": bench_check_profit(100),
+        f"market_data.fetch_initial_data[daily={scaled(5000)}]": bench_fetch_initial_data(daily_payload(scaled(5000)), "TIME_SERIES_DAILY"),
+        f"market_data.fetch_initial_data[1min={scaled(20000)}]": bench_fetch_initial_data(intraday_payload(scaled(20000)), "TIME_SERIES_INTRADAY"),
+        "market_data.analyze_trend[365]": bench_analyze_trend(365),
+        f"bot.start[symbols={scaled(50)}]": bench_bot_cycle(scaled(50), warmup + rounds),
+        f"trading_simulation.run_simulation[days={scaled(250)}]": bench_run_simulation(scaled(250)),
+        f"kernel.run_kernel[ticks={scaled(100000)}]": bench_kernel(scaled(100000), None),
+        f"kernel.run_kernel[ticks={scaled(100000)},window=30]": bench_kernel(scaled(100000), 30),
+    }
+
+
+def run_benchmarks(benchmarks, rounds=5, warmup=1):
+    """Time each benchmark ``rounds`` times after ``warmup`` untimed calls."""
+    results = {}
+    for name, bench in benchmarks.items():
+        for _ in range(warmup):
+            bench()
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            bench()
+            timings.append(time.perf_counter() - started)
+        results[name] = {"median": statistics.median(timings), "min": min(timings), "max": max(timings), "rounds": rounds}
+        print(f"{name}: median {results[name]['median'] * 1000:.3f} ms")
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD, thresholds=None):
+    """Return ``(name, baseline_median, median, ratio)`` for every benchmark slower than its threshold allows."""
+    thresholds = thresholds or {}
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        allowed = thresholds.get(name, threshold)
+        ratio = result["median"] / baseline[name]["median"]
+        if ratio > 1 + allowed:
+            regressions.append((name, baseline[name]["median"], result["median"], ratio))
+    return regressions
+
+
+def parse_thresholds(values):
+    thresholds = {}
+    for value in values:
+        name, _, limit = value.rpartition("=")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot's hot paths offline and check them against a baseline.")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor for workload sizes")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--save", default=None, metavar="FILE", help="Write results to FILE as a JSON baseline")
+    parser.add_argument("--compare", default=None, metavar="FILE", help="Compare results with the baseline in FILE")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of the median as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NAME=FRACTION",
+                        help="Override the allowed slowdown for one benchmark")
+    args = parser.parse_args()
+
+    # Per-tick INFO logs would dominate the timings
+    logging.disable(logging.INFO)
+    benchmarks = build_benchmarks(args.scale, args.rounds)
+    if args.filter:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if args.filter in name}
+    results = run_benchmarks(benchmarks, args.rounds)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.threshold, parse_thresholds(args.threshold_for))
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
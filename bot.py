@@ -3,10 +3,17 @@ import time
 from ib_insync import IB, Stock, MarketOrder, LimitOrder
 import logging
 import argparse
+from functools import partial
 from alpaca.trading import TradingClient
 from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest
 from alpaca.trading.enums import OrderSide, TimeInForce, OrderStatus
 from get_market_data import GetMarketData
+from market_data_store import BarRecorder
+from bar_aggregator import BarAggregator, TIMEFRAME_SECONDS
+from profiler import SamplingProfiler
+from state_journal import StateJournal, new_stock_state
+from coordinator import ShardCoordinator, build_worker_bot
+from log_setup import configure_logging
 from utils import calculate_rsi
 from zone_recovery_logic import ZoneRecoveryLogic
 from dotenv import load_dotenv
@@ -50,7 +57,7 @@ class IBClient:
     def monitor_order(self, trade):
         while not trade.isDone():
             self.ib.sleep(1)  # Sleeps to prevent excessive updates, respects API limits
-            logging.info(f"Current order status: {trade.orderStatus.status}")
+            logging.info("Current order status: %s", trade.orderStatus.status, extra={"sample_key": trade.order.orderId})
         logging.info(f'Order done with status {trade.orderStatus.status}')
         return trade.order
 
@@ -96,56 +103,123 @@ class AlpacaClient:
         return order
 
 class ZoneRecoveryBot:
-    def __init__(self, tickers, ib_client, alpaca_trading_client):
-        self.market_data_service = GetMarketData()
+    def __init__(self, tickers, ib_client, alpaca_trading_client, profiler=None, journal=None, market_data_service=None, scan_candidates=True, bar_aggregator=None):
+        self.market_data_service = market_data_service or GetMarketData()
         self.data_update_interval = 60
         self.running = True
+        self.journal = journal
+        self.scan_candidates = scan_candidates
+        self.bar_aggregator = bar_aggregator
         self.stocks_to_check = self.load_and_update_metadata(tickers)
+        if self.journal:
+            self.journal.attach(self.stocks_to_check)
         self.logic = ZoneRecoveryLogic()
         self.ib_client = ib_client
         self.alpaca_trading_client = alpaca_trading_client
         self.total_session_profit = 0
+        self.profiler = profiler
 
     def load_and_update_metadata(self, tickers):
-        stocks_data = {}
-        scanned_stocks = [candidates for candidates, _ in self.market_data_service.get_potential_candidates()]
+        stocks_data = self.journal.recover() if self.journal else {}
+        if stocks_data:
+            # Recovered state already carries the screened stocks and their open legs
+            scanned_stocks = list(stocks_data)
+        elif self.scan_candidates:
+            scanned_stocks = [candidates for candidates, _ in self.market_data_service.get_potential_candidates()]
+        else:
+            scanned_stocks = []
         combined_tickers = tickers + [stock for stock in scanned_stocks if stock not in tickers]
-        updated_stocks_data = {ticker: stocks_data.get(ticker, {"fetched": False, "prices": [], "volumes": [], "long": [], "short": []}) for ticker in combined_tickers}
+        updated_stocks_data = {ticker: stocks_data.get(ticker, new_stock_state()) for ticker in combined_tickers}
         return updated_stocks_data
 
+    def add_tickers(self, tickers, states=None):
+        """Start watching additional tickers, e.g. ones handed over from another worker.
+
+        ``states`` maps tickers to the state (history and open legs) they had on their previous owner.
+        """
+        states = states or {}
+        for ticker in tickers:
+            if ticker not in self.stocks_to_check:
+                self.stocks_to_check[ticker] = states.get(ticker) or new_stock_state()
+                if self.journal:
+                    self.journal.record_adopt(ticker, self.stocks_to_check[ticker])
+
     def start(self):
         while self.running:
             try:
-                for stock, info in self.stocks_to_check.items():
-                    if not info["fetched"]:
-                        initial_data, volumes = self.market_data_service.fetch_initial_data(stock, "1day", 30, "delayed", "TIME_SERIES_DAILY")
-                        self.stocks_to_check[stock]["prices"].extend([price for price, _ in initial_data])
-                        self.stocks_to_check[stock]["timestamps"] = [time for _, time in initial_data]
-                        self.stocks_to_check[stock]["volumes"].extend(volumes)
-                        self.stocks_to_check[stock]["fetched"] = True
-                        self.stocks_to_check[stock]["previous_rsi"] = calculate_rsi(self.stocks_to_check[stock]["prices"], self.logic.rsi_period)
-                    if len(self.stocks_to_check[stock]["prices"]) >= self.logic.rsi_period:
-                        price, timestamp, volume = self.market_data_service.fetch_latest_price(stock, "1min")
-                        if price and (not self.stocks_to_check[stock]['timestamps'] or timestamp != self.stocks_to_check[stock]['timestamps'][-1]):
-                            self.stocks_to_check[stock]['prices'].append(price)
-                            self.stocks_to_check[stock]['timestamps'].append(timestamp)
-                            self.stocks_to_check[stock]["volumes"].append(volume)
-                            self.stocks_to_check[stock]['prices'].pop(0)
-                            self.stocks_to_check[stock]['timestamps'].pop(0)
-                            self.stocks_to_check[stock]['volumes'].pop(0)
-                            self.check_and_execute_trades(stock, price)
-                    else:
-                        logging.warning(f"Did not find enough initial data for stock: {stock}")
-                        self.stocks_to_check[stock]["fetched"] = False
+                self.run_profiled_cycle()
                 time.sleep(self.data_update_interval)
             except KeyboardInterrupt:
                 self.stop()
             except Exception as e:
                 logging.error(f"An error occurred: {e}")
 
+    def run_profiled_cycle(self):
+        """Run one cycle, ending the profiler's cycle even when it fails so the sleep after it is not sampled."""
+        if self.profiler:
+            self.profiler.cycle_start()
+        try:
+            self.run_cycle()
+        finally:
+            if self.profiler:
+                self.profiler.cycle_end()
+
+    def run_cycle(self):
+        """Fetch the latest bar for every watched stock and act on it."""
+        for stock, info in self.stocks_to_check.items():
+            if self.bar_aggregator and info["fetched"] and not self.bar_aggregator.has_symbol(stock):
+                # State recovered from the journal or handed over by another worker comes without aggregated bars
+                self.seed_aggregated_bars(stock)
+            if not info["fetched"]:
+                initial_data, volumes = self.market_data_service.fetch_initial_data(stock, "1day", 30, "delayed", "TIME_SERIES_DAILY")
+                self.stocks_to_check[stock]["prices"].extend([price for price, _ in initial_data])
+                self.stocks_to_check[stock]["timestamps"] = [time for _, time in initial_data]
+                self.stocks_to_check[stock]["volumes"].extend(volumes)
+                self.stocks_to_check[stock]["fetched"] = True
+                self.stocks_to_check[stock]["previous_rsi"] = calculate_rsi(self.stocks_to_check[stock]["prices"], self.logic.rsi_period)
+                if self.bar_aggregator:
+                    self.bar_aggregator.seed(stock, "1day", initial_data, volumes)
+                if self.journal:
+                    self.journal.record_fetch(stock, [price for price, _ in initial_data], self.stocks_to_check[stock]["timestamps"],
+                                              volumes, self.stocks_to_check[stock]["previous_rsi"])
+            if len(self.stocks_to_check[stock]["prices"]) >= self.logic.rsi_period:
+                price, timestamp, volume = self.market_data_service.fetch_latest_price(stock, "1min")
+                if price and (not self.stocks_to_check[stock]['timestamps'] or timestamp != self.stocks_to_check[stock]['timestamps'][-1]):
+                    self.stocks_to_check[stock]['prices'].append(price)
+                    self.stocks_to_check[stock]['timestamps'].append(timestamp)
+                    self.stocks_to_check[stock]["volumes"].append(volume)
+                    self.stocks_to_check[stock]['prices'].pop(0)
+                    self.stocks_to_check[stock]['timestamps'].pop(0)
+                    self.stocks_to_check[stock]['volumes'].pop(0)
+                    if self.journal:
+                        self.journal.record_bar(stock, price, timestamp, volume)
+                    if self.bar_aggregator:
+                        self.bar_aggregator.add_bar(stock, timestamp, price, volume)
+                    self.check_and_execute_trades(stock, price)
+                    if self.journal:
+                        self.journal.record_rsi(stock, self.stocks_to_check[stock].get("previous_rsi"))
+            else:
+                logging.warning("Did not find enough initial data for stock: %s", stock, extra={"sample_key": stock})
+                self.stocks_to_check[stock]["fetched"] = False
+                if self.journal:
+                    self.journal.record_unfetched(stock)
+
+    def seed_aggregated_bars(self, stock):
+        """Fetch the history of the RSI timeframe (daily without one) and seed the bar aggregator with it."""
+        timeframe = self.logic.timeframe or "1day"
+        if timeframe == "1day":
+            data, volumes = self.market_data_service.fetch_initial_data(stock, "1day", 30, "delayed", "TIME_SERIES_DAILY")
+        else:
+            data, volumes = self.market_data_service.fetch_initial_data(stock, timeframe, 30, "delayed", "TIME_SERIES_INTRADAY")
+        self.bar_aggregator.seed(stock, timeframe, data, volumes)
+
     def check_and_execute_trades(self, stock, current_price):
         """Check if a trade should be executed based on current price and profit conditions."""
-        result = self.logic.calculate_rsi_and_check_profit(self.stocks_to_check[stock], stock, current_price)
+        prices = None
+        if self.bar_aggregator and self.logic.timeframe:
+            # Run the RSI on locally aggregated bars instead of the raw price history
+            prices = self.bar_aggregator.closes(stock, self.logic.timeframe)
+        result = self.logic.calculate_rsi_and_check_profit(self.stocks_to_check[stock], stock, current_price, prices)
         if result:
             action, price, profit = result
             if action == "CLOSE_ALL":
@@ -174,12 +248,14 @@ class ZoneRecoveryBot:
         for field in fields:
             self.stocks_to_check[stock][field] = []
         self.stocks_to_check[stock]['fetched'] = False
+        if self.journal:
+            self.journal.record_reset(stock)
 
     def trigger_trade(self, symbol, action, quantity, current_price, alpaca=False):
         """Trigger a trade with the specified parameters."""
         symbol = symbol.upper()
         if alpaca:
-            order = self.alpaca_trading_client.place_order(self, symbol, quantity, action, False, limit_price=current_price)
+            order = self.alpaca_trading_client.place_order(symbol, quantity, action, False, limit_price=current_price)
             order = self.alpaca_trading_client.monitor_order(order)
             if order.status == OrderStatus.FILLED:
                 self.handle_filled_order(order, True, symbol)
@@ -190,36 +266,76 @@ class ZoneRecoveryBot:
             if not trade:
                 logging.info(f'Stock {symbol} can\'t be traded, skipping.')
                 return
-            order = self.ib_client.monitor_order(trade)
+            self.ib_client.monitor_order(trade)
             if trade.orderStatus.status == 'Filled':
-                self.handle_filled_order(order, False, symbol)
+                self.handle_filled_order(trade, False, symbol)
             else:
                 logging.info(f'IB Order was not filled. Status was {trade.orderStatus.status}')
 
     def handle_filled_order(self, order, alpaca, symbol):
-        """Handle filled orders."""
+        """Handle filled orders: ``order`` is the Alpaca order, or the ib_insync Trade for IB."""
         if alpaca:
             # Accessing Alpaca order object attributes directly
             price = order.filled_avg_price if order.filled_avg_price else order.limit_price
             qty = order.filled_qty
-            logging.info(f"Order for {symbol} filled at {price} with quantity {qty}")
+            logging.info("Order for %s filled at %s with quantity %s", symbol, price, qty)
             self.stocks_to_check[symbol]["long"].append({"price": price, "qty": qty})
+            if self.journal:
+                self.journal.record_fill(symbol, "long", price, qty)
         else:
-            # Assuming 'order' is a dictionary with keys for IB orders
-            price = order.get('avgFillPrice')
-            qty = order.get('filled')
-            logging.info(f"Order for {symbol} filled at {price} with quantity {qty}")
+            # An ib_insync Order only holds what was requested; the fill is reported on the trade's status
+            price = order.orderStatus.avgFillPrice
+            qty = order.orderStatus.filled
+            logging.info("Order for %s filled at %s with quantity %s", symbol, price, qty)
             self.stocks_to_check[symbol]["short"].append({"price": price, "qty": qty})
+            if self.journal:
+                self.journal.record_fill(symbol, "short", price, qty)
 
     def stop(self):
         self.running = False
+        if self.profiler:
+            self.profiler.stop()
+        if self.journal:
+            self.journal.close()
         self.ib_client.stop()
         logging.info("Disconnected and stopped successfully.")
 
 def main():
     parser = argparse.ArgumentParser(description='Run the Zone Recovery Trading Bot with specified stock tickers.')
     parser.add_argument('tickers', nargs='+', help='List of stock tickers to monitor')
+    parser.add_argument('--profile', nargs='?', const='profiles', default=None, metavar='DIR',
+                        help='Profile the running loop and write per-cycle artifacts to DIR (default: profiles)')
+    parser.add_argument('--profile-every', type=int, default=10, metavar='N',
+                        help='Take a tracemalloc snapshot every N cycles while profiling')
+    parser.add_argument('--profile-interval', type=float, default=0.01, metavar='SECONDS',
+                        help='Seconds between CPU stack samples while profiling')
+    parser.add_argument('--journal', default=None, metavar='DIR',
+                        help='Persist positions and history to a state journal in DIR and recover from it on restart')
+    parser.add_argument('--snapshot-every', type=int, default=1000, metavar='N',
+                        help='Compact the state journal into a snapshot every N records')
+    parser.add_argument('--record', default=None, metavar='DIR',
+                        help='Capture every ingested bar to a columnar store in DIR for later backtests')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Split the watchlist across N worker processes, each with its own IB client id')
+    parser.add_argument('--requests-per-minute', type=float, default=75, metavar='N',
+                        help='Market data request budget shared by all workers')
+    parser.add_argument('--rsi-timeframe', choices=sorted(TIMEFRAME_SECONDS), default=None,
+                        help='Run the RSI on bars aggregated locally from the 1-minute stream instead of the raw history')
+    parser.add_argument('--log-level', default='INFO', help='Logging level (default: INFO)')
+    parser.add_argument('--log-json', action='store_true', help='Write compact JSON log lines for machine analysis')
+    parser.add_argument('--log-sample-interval', type=float, default=60.0, metavar='SECONDS',
+                        help='Emit per-symbol, per-tick messages at most once per SECONDS for each symbol (0 disables sampling)')
     args = parser.parse_args()
+    configure_logging(args.log_level.upper(), structured=args.log_json, sample_interval=args.log_sample_interval)
+
+    if args.workers > 1:
+        # Each worker journals to <journal>/worker-N and profiles to <profile>/worker-N; recorded bars share one store
+        bot_factory = partial(build_worker_bot, rsi_timeframe=args.rsi_timeframe, profile_dir=args.profile,
+                              profile_interval=args.profile_interval, profile_every=args.profile_every, record_dir=args.record)
+        coordinator = ShardCoordinator(args.tickers, args.workers, bot_factory=bot_factory, requests_per_minute=args.requests_per_minute,
+                                       state_dir=args.journal, snapshot_every=args.snapshot_every)
+        coordinator.run()
+        return
 
     # Load Alpaca credentials from environment variables
     alpaca_api_key = os.getenv('ALPACA_API_KEY')
@@ -231,8 +347,23 @@ def main():
     # Initialize IB client
     ib_client = IBClient(client_id="123")
 
+    # Optionally profile the loop; send SIGUSR1 to pause or resume sampling
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler(args.profile, sample_interval=args.profile_interval, snapshot_every=args.profile_every)
+        profiler.install_signal_handler()
+        profiler.start()
+
+    journal = StateJournal(args.journal, snapshot_every=args.snapshot_every) if args.journal else None
+
+    market_data_service = GetMarketData(recorder=BarRecorder(args.record)) if args.record else None
+
+    bar_aggregator = BarAggregator(timeframes=(args.rsi_timeframe,)) if args.rsi_timeframe else None
+
     # Initialize and start the trading bot
-    app = ZoneRecoveryBot(args.tickers, ib_client, alpaca_trading_client)
+    app = ZoneRecoveryBot(args.tickers, ib_client, alpaca_trading_client, profiler=profiler, journal=journal,
+                          market_data_service=market_data_service, bar_aggregator=bar_aggregator)
+    app.logic.timeframe = args.rsi_timeframe
     app.start()
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+import os
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import multiprocessing
+from get_market_data import GetMarketData
+from market_data_store import BarRecorder
+from bar_aggregator import BarAggregator
+from profiler import SamplingProfiler
+from state_journal import StateJournal
+from log_setup import logging_config, restart_logging
+
+
+class SharedRateLimiter:
+    """Token bucket shared by every worker process so the whole bot stays within one API budget."""
+
+    def __init__(self, requests_per_minute, burst=None, context=multiprocessing):
+        self.rate = requests_per_minute / 60.0
+        self.burst = burst if burst is not None else max(1.0, self.rate)
+        self._lock = context.Lock()
+        self._tokens = context.Value('d', self.burst, lock=False)
+        self._updated = context.Value('d', time.monotonic(), lock=False)
+
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.burst, self._tokens.value + (now - self._updated.value) * self.rate)
+                self._updated.value = now
+                if tokens >= 1:
+                    self._tokens.value = tokens - 1
+                    return
+                self._tokens.value = tokens
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+def build_worker_bot(worker_index, symbols, rate_limiter, journal=None, base_client_id=123, is_paper=True, rsi_timeframe=None,
+                     profile_dir=None, profile_interval=0.01, profile_every=10, record_dir=None):
+    """Default worker factory: a ZoneRecoveryBot with its own IB client id, market data client and journal.
+
+    Profiles are written to a per-worker subdirectory of ``profile_dir``; recorded bars share
+    ``record_dir``, since every symbol is owned by exactly one live worker.
+    """
+    # Imported here because bot.py imports this module for its --workers option
+    from bot import ZoneRecoveryBot, IBClient, AlpacaClient
+    ib_client = IBClient(client_id=base_client_id + worker_index)
+    alpaca_trading_client = AlpacaClient(is_paper=is_paper)
+    recorder = BarRecorder(record_dir) if record_dir else None
+    market_data_service = GetMarketData(rate_limiter=rate_limiter, recorder=recorder)
+    profiler = None
+    if profile_dir:
+        profiler = SamplingProfiler(os.path.join(profile_dir, f"worker-{worker_index}"), sample_interval=profile_interval,
+                                    snapshot_every=profile_every)
+        profiler.install_signal_handler()
+        profiler.start()
+    bar_aggregator = BarAggregator(timeframes=(rsi_timeframe,)) if rsi_timeframe else None
+    bot = ZoneRecoveryBot(symbols, ib_client, alpaca_trading_client, profiler=profiler, journal=journal,
+                          market_data_service=market_data_service, scan_candidates=False, bar_aggregator=bar_aggregator)
+    bot.logic.timeframe = rsi_timeframe
+    return bot
+
+
+def run_worker(worker_index, symbols, inbox, acks, stop_event, bot_factory, rate_limiter, session_profit,
+               data_update_interval, journal_dir, snapshot_every, log_config=None):
+    """Worker process entry point: run bot cycles over a shard until told to stop."""
+    listener = restart_logging(log_config)
+    try:
+        journal = StateJournal(journal_dir, snapshot_every=snapshot_every)
+        bot = bot_factory(worker_index, symbols, rate_limiter, journal)
+        reported_profit = 0
+        while not stop_event.is_set():
+            try:
+                while True:
+                    handover = inbox.get_nowait()
+                    bot.add_tickers(list(handover), {symbol: state for symbol, (_, state) in handover.items()})
+                    # The adoption is journaled, so the previous owners' journals may now let go of these symbols
+                    acks.put([(source_index, symbol) for symbol, (source_index, _) in handover.items()])
+            except queue.Empty:
+                pass
+            try:
+                bot.run_profiled_cycle()
+            except Exception as e:
+                logging.error(f"Worker {worker_index}: an error occurred: {e}")
+            # Publish only the change since the last report; other workers add to the same total
+            delta = bot.total_session_profit - reported_profit
+            if delta:
+                with session_profit.get_lock():
+                    session_profit.value += delta
+                reported_profit = bot.total_session_profit
+            stop_event.wait(data_update_interval)
+        bot.stop()
+    finally:
+        # Worker processes end with os._exit, which skips the atexit flush of queued records
+        if listener:
+            listener.stop()
+
+
+def recover_worker_state(journal_dir):
+    """Read a stopped worker's journal and return its per-symbol state."""
+    journal = StateJournal(journal_dir, snapshot_every=0)
+    try:
+        return journal.recover()
+    finally:
+        journal.close()
+
+
+def release_symbols(journal_dir, symbols):
+    """Drop ``symbols`` from a stopped worker's journal once another worker has adopted them."""
+    journal = StateJournal(journal_dir, snapshot_every=0)
+    try:
+        journal.recover()
+        for symbol in symbols:
+            journal.record_release(symbol)
+    finally:
+        journal.close()
+
+
+class ShardCoordinator:
+    """Split the watchlist across worker processes and move symbols off workers that die.
+
+    Every worker journals its state to ``<state_dir>/worker-N`` (a temporary directory when
+    ``state_dir`` is not given). A dead worker's symbols are handed to the survivors together
+    with their recovered history and open legs, so positions it held are still hedged and
+    closed. On restart with the same ``state_dir``, symbols stay with the worker whose journal
+    holds them.
+    """
+
+    def __init__(self, tickers, num_workers, bot_factory=build_worker_bot, requests_per_minute=75,
+                 data_update_interval=60, scan_candidates=True, start_method=None, state_dir=None, snapshot_every=1000):
+        self.tickers = list(tickers)
+        self.num_workers = num_workers
+        self.bot_factory = bot_factory
+        self.data_update_interval = data_update_interval
+        self.scan_candidates = scan_candidates
+        self.state_dir = state_dir
+        self.snapshot_every = snapshot_every
+        self.context = multiprocessing.get_context(start_method)
+        self.rate_limiter = SharedRateLimiter(requests_per_minute, context=self.context)
+        self.session_profit = self.context.Value('d', 0.0)
+        self.stop_event = self.context.Event()
+        self.acks = self.context.Queue()
+        self.assignments = {}
+        self.processes = {}
+        self.inboxes = {}
+        self.stranded = []
+        self.pending = {}  # symbol -> (source worker, state) handed over but not yet adopted
+        self._temporary_state_dir = None
+
+    @property
+    def total_session_profit(self):
+        return self.session_profit.value
+
+    def journal_dir(self, worker_index):
+        return os.path.join(self.state_dir, f"worker-{worker_index}")
+
+    def start(self):
+        """Screen for candidates once, shard the watchlist and launch the workers."""
+        if self.state_dir is None:
+            self.state_dir = self._temporary_state_dir = tempfile.mkdtemp(prefix="zone-recovery-state-")
+        owned = self._recover_ownership()
+        tickers = self.tickers
+        if self.scan_candidates:
+            market_data_service = GetMarketData(rate_limiter=self.rate_limiter)
+            scanned = [candidate for candidate, _ in market_data_service.get_potential_candidates()]
+            tickers = tickers + [stock for stock in scanned if stock not in tickers]
+
+        # Symbols recovered from a journal stay with that worker; the rest go to the least loaded one
+        self.assignments = {worker_index: list(owned.get(worker_index, [])) for worker_index in range(self.num_workers)}
+        claimed = {symbol for symbols in owned.values() for symbol in symbols}
+        for symbol in tickers:
+            if symbol not in claimed:
+                self.assignments[min(self.assignments, key=lambda index: len(self.assignments[index]))].append(symbol)
+                claimed.add(symbol)
+
+        for worker_index in range(self.num_workers):
+            self.inboxes[worker_index] = self.context.Queue()
+            process = self.context.Process(
+                target=run_worker,
+                args=(worker_index, self.assignments[worker_index], self.inboxes[worker_index], self.acks, self.stop_event,
+                      self.bot_factory, self.rate_limiter, self.session_profit, self.data_update_interval,
+                      self.journal_dir(worker_index), self.snapshot_every, logging_config()),
+                name=f"zone-recovery-worker-{worker_index}",
+                daemon=True,
+            )
+            process.start()
+            self.processes[worker_index] = process
+            logging.info(f"Started worker {worker_index} with {len(self.assignments[worker_index])} symbols")
+
+        # Journals of workers beyond the current count are handed over like those of dead workers
+        for worker_index, symbols in owned.items():
+            if worker_index >= self.num_workers:
+                self._hand_over(worker_index, symbols)
+
+    def _recover_ownership(self):
+        """Map worker indexes to the symbols their journals in ``state_dir`` hold."""
+        found = {}
+        for name in os.listdir(self.state_dir) if os.path.isdir(self.state_dir) else []:
+            prefix, _, index = name.partition("-")
+            if prefix == "worker" and index.isdigit():
+                found[int(index)] = recover_worker_state(os.path.join(self.state_dir, name))
+
+        def last_modified(worker_index):
+            directory = self.journal_dir(worker_index)
+            return max((os.path.getmtime(os.path.join(directory, name)) for name in os.listdir(directory)), default=0)
+
+        owned = {}
+        owners = {}
+        # A symbol in several journals was adopted but not yet released when the coordinator stopped;
+        # the adopter's journal is the one written last
+        for worker_index in sorted(found, key=last_modified, reverse=True):
+            for symbol in found[worker_index]:
+                if symbol in owners:
+                    logging.warning(f"{symbol} is also journaled by worker {owners[symbol]}; dropping the copy of worker {worker_index}")
+                    release_symbols(self.journal_dir(worker_index), [symbol])
+                    continue
+                owners[symbol] = worker_index
+                owned.setdefault(worker_index, []).append(symbol)
+        return owned
+
+    def _hand_over(self, worker_index, symbols):
+        """Move ``symbols`` and their journaled state from a stopped worker to the least loaded live workers."""
+        try:
+            states = recover_worker_state(self.journal_dir(worker_index))
+        except (OSError, ValueError) as e:
+            # Handing the symbols over with empty state would silently orphan any open legs
+            logging.error(f"Could not read the journal of worker {worker_index} ({e}); not reassigning {symbols}, "
+                          "their open positions at the brokers must be checked by hand")
+            self.stranded.extend(symbols)
+            return
+        handover = {index: {} for index in self.processes}
+        for symbol in symbols:
+            target = min(handover, key=lambda index: len(self.assignments[index]) + len(handover[index]))
+            # A symbol the dead worker had not adopted yet is still journaled by its previous owner
+            source = self.pending[symbol] if symbol in self.pending and symbol not in states else (worker_index, states.get(symbol))
+            handover[target][symbol] = source
+            self.pending[symbol] = source
+        for target, target_handover in handover.items():
+            if target_handover:
+                self.assignments[target].extend(target_handover)
+                self.inboxes[target].put(target_handover)
+                with_legs = [symbol for symbol, (_, state) in target_handover.items() if state and (state["long"] or state["short"])]
+                if with_legs:
+                    logging.warning(f"Worker {target} takes over open positions in {with_legs} from worker {worker_index}")
+
+    def _release_adopted(self):
+        try:
+            while True:
+                adopted = self.acks.get_nowait()
+                by_source = {}
+                for source_index, symbol in adopted:
+                    by_source.setdefault(source_index, []).append(symbol)
+                    self.pending.pop(symbol, None)
+                for source_index, symbols in by_source.items():
+                    release_symbols(self.journal_dir(source_index), symbols)
+        except queue.Empty:
+            pass
+
+    def check_workers(self):
+        """Reassign the symbols of any dead worker to the least loaded live workers."""
+        self._release_adopted()
+        for worker_index, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            orphaned = self.assignments.pop(worker_index)
+            del self.processes[worker_index]
+            self.inboxes.pop(worker_index).close()
+            logging.error(f"Worker {worker_index} died with exit code {process.exitcode}, reassigning {len(orphaned)} symbols")
+            if not self.processes:
+                logging.error("No workers left to take over symbols")
+                self.assignments[worker_index] = orphaned
+                return False
+            self._hand_over(worker_index, orphaned)
+        return True
+    def run(self, poll_interval=1):
+        """Start the workers and supervise them until interrupted or none are left."""
+        self.start()
+        try:
+            while not self.stop_event.is_set() and self.check_workers():
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout=10):
+        self.stop_event.set()
+        for process in self.processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._release_adopted()
+        if self._temporary_state_dir:
+            shutil.rmtree(self._temporary_state_dir, ignore_errors=True)
+        logging.info(f"All workers stopped. Total session profit: {self.total_session_profit}")
+
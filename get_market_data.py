@@ -4,21 +4,23 @@ import logging
 from dotenv import load_dotenv
 import numpy as np
 from utils import calculate_rsi  # Import the utility function
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from log_setup import configure_logging
 
 class GetMarketData:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, recorder=None):
         load_dotenv()  # Load environment variables from .env file
         self.api_key = os.getenv('TRADING_KEY')  # Retrieve API key from environment variable
         self.base_url = "https://www.alphavantage.co/query"  # Base URL for API requests
         self.short_term_window = 20
         self.long_term_window = 50
+        self.rate_limiter = rate_limiter  # Optional limiter shared with other processes
+        self.recorder = recorder  # Optional BarRecorder capturing every ingested bar
 
     def _make_api_request(self, params):
         """Private method to handle API requests."""
         params['apikey'] = self.api_key  # Add the API key to the parameters
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
         try:
             response = requests.get(self.base_url, params=params)
             response.raise_for_status()  # Raises HTTPError for bad requests
@@ -47,7 +49,7 @@ class GetMarketData:
 
         # Determine the correct key for time series data based on the series type
         if series == "TIME_SERIES_INTRADAY":
-            time_series_key = "Time Series (1min)"
+            time_series_key = f"Time Series ({interval})"
         elif series == "TIME_SERIES_DAILY":
             time_series_key = "Time Series (Daily)"
         else:
@@ -58,8 +60,11 @@ class GetMarketData:
         sorted_times = sorted(time_series.keys())[-period:]  # Get the last `period` entries
 
         # Return both prices and their respective timestamps and volumes as lists of tuples
-        return [(float(time_series[time]['4. close']), time) for time in sorted_times], \
-               [int(time_series[time]['5. volume']) for time in sorted_times]
+        prices = [(float(time_series[time]['4. close']), time) for time in sorted_times]
+        volumes = [int(time_series[time]['5. volume']) for time in sorted_times]
+        if self.recorder:
+            self.recorder.record(symbol, interval, prices, volumes)
+        return prices, volumes
 
     def fetch_latest_price(self, symbol, interval="1min", mode="realtime"):
         """Fetch the most recent price for the specified stock symbol along with its timestamp."""
@@ -70,9 +75,11 @@ class GetMarketData:
         if latest_time:
             latest_price = float(time_series[latest_time]['4. close'])
             volume = int(time_series[latest_time]['5. volume'])
-            logging.info(f"Latest price for {symbol}: {latest_price} at {latest_time} with volume: {volume}")
+            if self.recorder:
+                self.recorder.record(symbol, interval, [(latest_price, latest_time)], [volume])
+            logging.info("Latest price for %s: %s at %s with volume: %s", symbol, latest_price, latest_time, volume, extra={"sample_key": symbol})
             return latest_price, latest_time, volume
-        logging.warning(f"No latest price data available for {symbol}")
+        logging.warning("No latest price data available for %s", symbol, extra={"sample_key": symbol})
         return None, None, None
 
     def fetch_top_gainers_losers_most_traded(self):
@@ -100,21 +107,31 @@ class GetMarketData:
                         break
         return low_price_stocks
 
-    def get_potential_candidates(self, price_limit=10):
-        """Fetch potential stock candidates by analyzing trends."""
+    def get_potential_candidates(self, price_limit=10, bar_aggregator=None, timeframe="1day"):
+        """Fetch potential stock candidates by analyzing trends.
+
+        With a bar aggregator, candidates that already have at least ``long_term_window`` locally
+        aggregated bars in ``timeframe`` (symbols that have been streamed for a while) are analyzed
+        on those instead of downloading their daily history; all others, and every candidate when the
+        aggregator does not build ``timeframe``, still cost one request.
+        """
         candidates = self.filter_stocks_by_price(price_limit)
         potential_candidates = []
 
         for candidate in candidates:
-            historical_data, volumes = self.fetch_initial_data(candidate, "1day", 365, "delayed", "TIME_SERIES_DAILY")
-            entry_signal = self.analyze_trend(historical_data, volumes, support_level=0.8, resistance_level=1.2)  # Adjust support and resistance as needed
+            historical_data, volumes = ([], [])
+            if bar_aggregator and timeframe in bar_aggregator.timeframes:
+                historical_data, volumes = bar_aggregator.history(candidate, timeframe)
+            if len(historical_data) < self.long_term_window:
+                historical_data, volumes = self.fetch_initial_data(candidate, "1day", 365, "delayed", "TIME_SERIES_DAILY")
+            entry_signal = self.analyze_trend(historical_data, volumes, support_level=0.8, resistance_level=1.2, symbol=candidate)  # Adjust support and resistance as needed
             if entry_signal in ["Buy", "Sell"]:
                 potential_candidates.append((candidate, entry_signal))
                 logging.info(f"Added {candidate} to potential candidates based on trend analysis with signal {entry_signal}.")
 
         return potential_candidates
 
-    def analyze_trend(self, historical_data, volumes, support_level, resistance_level, rsi_period=14):
+    def analyze_trend(self, historical_data, volumes, support_level, resistance_level, rsi_period=14, symbol=None):
         """Analyze trend based on moving averages and other indicators."""
         # Extract prices from the historical data tuples
         prices = np.array([price for price, date in historical_data])
@@ -132,18 +149,19 @@ class GetMarketData:
 
             if sma_short > sma_long:
                 trend = "upward"
-                logging.info(f"Upward trend detected with SMA {sma_short} and LMA {sma_long}")
+                logging.info("Upward trend detected with SMA %s and LMA %s", sma_short, sma_long, extra={"sample_key": symbol})
             elif sma_short < sma_long:
                 trend = "downward"
-                logging.info(f"Downward trend detected with SMA {sma_short} and LMA {sma_long}")
+                logging.info("Downward trend detected with SMA %s and LMA %s", sma_short, sma_long, extra={"sample_key": symbol})
 
-            logging.info(f"Current price: {current_price}")
+            logging.info("Current price: %s", current_price, extra={"sample_key": symbol})
             if trend == "upward" and current_volume > average_volume and rsi < 30 and current_price > resistance_level:
                 entry_signal = "Buy"
             elif trend == "downward" and current_volume > average_volume and rsi > 70 and current_price < support_level:
                 entry_signal = "Sell"
 
-            logging.info(f"Trend: {trend}, RSI: {rsi}, Volume: {current_volume}, Average Volume: {average_volume}, Support: {support_level}, Resistance: {resistance_level}, Entry Signal: {entry_signal}")
+            logging.info("Trend: %s, RSI: %s, Volume: %s, Average Volume: %s, Support: %s, Resistance: %s, Entry Signal: %s",
+                         trend, rsi, current_volume, average_volume, support_level, resistance_level, entry_signal, extra={"sample_key": symbol})
 
             return entry_signal
 
@@ -151,6 +169,7 @@ class GetMarketData:
 
 # Example usage
 if __name__ == "__main__":
+    configure_logging()
     market_data = GetMarketData()
     candidates = market_data.get_potential_candidates()
     logging.info(f"Potential trading candidates: {candidates}")
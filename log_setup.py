@@ -0,0 +1,130 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_active_config = None
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queue handler that hands records over unformatted.
+
+    The stock QueueHandler renders every message in the calling thread before enqueueing it;
+    here ``msg % args`` is left to the listener thread, so the hot path only pays for putting a
+    record on an in-process queue. Log arguments must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BackgroundListener(QueueListener):
+    """QueueListener that may be stopped more than once (explicitly and again at exit)."""
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+class SamplingFilter(logging.Filter):
+    """Let through at most one record per ``interval`` seconds for each sample key and message.
+
+    Only records logged with ``extra={"sample_key": ...}`` are sampled; the number of records
+    dropped since the last one that passed is attached to it as ``record.suppressed``.
+    """
+
+    def __init__(self, interval=60.0):
+        super().__init__()
+        self.interval = interval
+        self._last_emitted = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, 'sample_key', None)
+        if key is None or self.interval <= 0:
+            return True
+        key = (key, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_emitted.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False
+            self._last_emitted[key] = now
+            record.suppressed = self._suppressed.pop(key, 0)
+        return True
+
+
+class SampledTextFormatter(logging.Formatter):
+    """The repo's plain text format, noting how many similar records sampling dropped."""
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} ({suppressed} similar messages suppressed)" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """Compact one-object-per-line output for machine analysis."""
+
+    def format(self, record):
+        entry = {'ts': round(record.created, 3), 'level': record.levelname, 'msg': record.getMessage()}
+        if getattr(record, 'sample_key', None) is not None:
+            entry['key'] = record.sample_key
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(',', ':'), default=str)
+
+
+def configure_logging(level=logging.INFO, structured=False, sample_interval=60.0, stream=None):
+    """Route the root logger through a background queue with per-symbol sampling.
+
+    Replaces any handlers on the root logger and returns the started QueueListener, which is
+    also stopped (flushing pending records) at interpreter exit.
+    """
+    global _active_config
+    _active_config = {'level': level, 'structured': structured, 'sample_interval': sample_interval, 'stream': stream}
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if structured else SampledTextFormatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_interval))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = BackgroundListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def logging_config():
+    """The arguments of the last configure_logging call, or None if logging was not configured."""
+    return dict(_active_config) if _active_config is not None else None
+
+
+def restart_logging(config):
+    """Set up logging in a worker process from the parent's ``logging_config()``.
+
+    A forked child inherits the queue handler but not the listener thread, and a spawned child
+    inherits neither, so ``config`` is passed explicitly (its stream must be picklable for
+    spawn). Returns the listener, which the worker must stop before it exits: worker processes
+    end through ``os._exit``, which skips the atexit flush.
+    """
+    if config is None:
+        return None
+    return configure_logging(**config)
@@ -0,0 +1,147 @@
+import os
+import csv
+import logging
+import numpy as np
+
+COLUMNS = (("timestamp", np.int64), ("close", np.float64), ("volume", np.int64))
+
+
+def to_epoch_seconds(timestamp):
+    """Convert an API or CSV timestamp string ("2021-01-04" or "2021-01-04 09:30:00") to epoch seconds."""
+    return int(np.datetime64(timestamp.strip().replace(" ", "T"), "s").astype(np.int64))
+
+
+def from_epoch_seconds(seconds, interval):
+    """Format epoch seconds the way the market data API stamps bars of the given interval."""
+    text = str(np.datetime64(int(seconds), "s")).replace("T", " ")
+    return text[:10] if interval == "1day" else text
+
+
+class BarRecorder:
+    """Append bars to a compact columnar store, one raw binary file per column.
+
+    Bars live under ``<root>/<interval>/<SYMBOL>/<column>.bin``. Only bars strictly newer
+    than the last recorded one are appended, so repeatedly fetched overlapping windows and
+    unchanged latest prices are stored once.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._last_timestamps = {}
+
+    def _symbol_dir(self, symbol, interval):
+        return os.path.join(self.root, interval, symbol.upper())
+
+    def _last_timestamp(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self._last_timestamps:
+            path = os.path.join(self._symbol_dir(symbol, interval), "timestamp.bin")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            last = None
+            if size:
+                last = int(np.fromfile(path, dtype=np.int64, count=1, offset=size - 8)[0])
+            self._last_timestamps[key] = last
+        return self._last_timestamps[key]
+
+    def record(self, symbol, interval, data, volumes):
+        """Append ``(price, timestamp)`` pairs and their volumes, as returned by GetMarketData."""
+        last = self._last_timestamp(symbol, interval)
+        timestamps, closes, new_volumes = [], [], []
+        for (price, timestamp), volume in zip(data, volumes):
+            seconds = to_epoch_seconds(timestamp)
+            if last is not None and seconds <= last:
+                continue
+            timestamps.append(seconds)
+            closes.append(price)
+            new_volumes.append(volume)
+            last = seconds
+        if timestamps:
+            self.append_columns(symbol, interval, timestamps, closes, new_volumes)
+        return len(timestamps)
+
+    def append_columns(self, symbol, interval, timestamps, closes, volumes):
+        """Append already converted columns without the freshness check."""
+        directory = self._symbol_dir(symbol, interval)
+        os.makedirs(directory, exist_ok=True)
+        for (name, dtype), values in zip(COLUMNS, (timestamps, closes, volumes)):
+            with open(os.path.join(directory, f"{name}.bin"), "ab") as f:
+                np.asarray(values, dtype=dtype).tofile(f)
+        self._last_timestamps[(symbol, interval)] = int(timestamps[-1])
+
+
+class StoredBars:
+    """Memory-mapped bars of one symbol, indexable like a list of ``(price, timestamp, volume)`` tuples."""
+
+    def __init__(self, directory, interval):
+        self.interval = interval
+        columns = {}
+        for name, dtype in COLUMNS:
+            path = os.path.join(directory, f"{name}.bin")
+            columns[name] = np.memmap(path, dtype=dtype, mode="r") if os.path.getsize(path) else np.empty(0, dtype=dtype)
+        # A capture interrupted mid-append can leave columns of different lengths
+        length = min(len(column) for column in columns.values())
+        self.timestamps = columns["timestamp"][:length]
+        self.closes = columns["close"][:length]
+        self.volumes = columns["volume"][:length]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return float(self.closes[index]), from_epoch_seconds(self.timestamps[index], self.interval), int(self.volumes[index])
+
+
+class BarStore:
+    """Read access to bars captured by BarRecorder or imported from CSV files."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def intervals(self):
+        return sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+
+    def symbols(self, interval):
+        directory = os.path.join(self.root, interval)
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def load(self, symbol, interval):
+        """Memory-map the bars of ``symbol``; nothing is read until the arrays are accessed."""
+        return StoredBars(os.path.join(self.root, interval, symbol.upper()), interval)
+
+    def import_csv(self, path, symbol, interval="1day", chunk_size=100_000):
+        """Stream a daily or intraday OHLCV CSV into the store.
+
+        The header must have a date or timestamp column, a close column and optionally a
+        volume column (case-insensitive, e.g. Alpha Vantage or Yahoo exports). Chronological
+        files are imported in chunks; newest-first files are read whole and reversed.
+        """
+        recorder = BarRecorder(self.root)
+        imported = 0
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = [column.strip().lower() for column in next(reader)]
+            time_column = next(i for i, column in enumerate(header) if column in ("timestamp", "date", "datetime", "time"))
+            close_column = header.index("adj close") if "adj close" in header else header.index("close")
+            volume_column = header.index("volume") if "volume" in header else None
+            chunk = []
+            descending = None
+            for row in reader:
+                if not row:
+                    continue
+                volume = int(float(row[volume_column])) if volume_column is not None else 0
+                chunk.append((float(row[close_column]), row[time_column], volume))
+                if descending is None and len(chunk) == 2:
+                    descending = to_epoch_seconds(chunk[0][1]) > to_epoch_seconds(chunk[1][1])
+                if not descending and len(chunk) >= chunk_size:
+                    imported += self._import_chunk(recorder, symbol, interval, chunk)
+                    chunk = []
+            if descending:
+                chunk.reverse()
+            imported += self._import_chunk(recorder, symbol, interval, chunk)
+        logging.info(f"Imported {imported} {interval} bars for {symbol} from {path}")
+        return imported
+
+    def _import_chunk(self, recorder, symbol, interval, chunk):
+        return recorder.record(symbol, interval, [(price, timestamp) for price, timestamp, _ in chunk], [volume for _, _, volume in chunk])
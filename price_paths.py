@@ -0,0 +1,131 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SimpleRandomWalk:
+    """Arithmetic random walk: each step multiplies the price by ``1 + N(0, volatility)``."""
+
+    def __init__(self, volatility=0.01):
+        self.volatility = volatility
+
+    def fill_returns(self, rng, out):
+        rng.standard_normal(out=out)
+        out *= self.volatility
+        out += 1
+
+
+class GeometricBrownianMotion:
+    """Log-normal returns with drift ``mu`` and volatility ``sigma`` per unit of ``dt``."""
+
+    def __init__(self, mu=0.0, sigma=0.01, dt=1.0):
+        self.mu = mu
+        self.sigma = sigma
+        self.dt = dt
+
+    def fill_log_returns(self, rng, out):
+        rng.standard_normal(out=out)
+        out *= self.sigma * np.sqrt(self.dt)
+        out += (self.mu - 0.5 * self.sigma ** 2) * self.dt
+
+    def fill_returns(self, rng, out):
+        self.fill_log_returns(rng, out)
+        np.exp(out, out=out)
+
+
+class JumpDiffusion(GeometricBrownianMotion):
+    """Merton jump-diffusion: GBM plus Poisson arrivals of normally distributed log jumps."""
+
+    def __init__(self, mu=0.0, sigma=0.01, jump_intensity=0.01, jump_mean=-0.02, jump_std=0.05, dt=1.0):
+        super().__init__(mu, sigma, dt)
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+
+    def fill_returns(self, rng, out):
+        self.fill_log_returns(rng, out)
+        # The sum of n normal jumps is normal with n times the mean and variance
+        jumps = rng.poisson(self.jump_intensity * self.dt, size=out.shape)
+        jumped = np.nonzero(jumps)
+        counts = jumps[jumped]
+        out[jumped] += counts * self.jump_mean + np.sqrt(counts) * self.jump_std * rng.standard_normal(len(counts))
+        np.exp(out, out=out)
+
+
+class GarchVolatility:
+    """GARCH(1, 1) log returns, producing volatility clustering.
+
+    The variance recursion is sequential in time. With more paths than steps it runs step by
+    step vectorized across paths; otherwise each path runs as a scalar loop, which avoids
+    paying numpy call overhead per step on long single-path horizons.
+    """
+
+    def __init__(self, mu=0.0, omega=1e-6, alpha=0.08, beta=0.9):
+        if alpha + beta >= 1:
+            raise ValueError("GARCH process requires alpha + beta < 1 to be stationary")
+        self.mu = mu
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+
+    def fill_returns(self, rng, out):
+        rng.standard_normal(out=out)
+        initial_variance = self.omega / (1 - self.alpha - self.beta)
+        if out.shape[0] >= out.shape[1]:
+            variance = np.full(out.shape[0], initial_variance)
+            shock = np.empty(out.shape[0])
+            for step in range(out.shape[1]):
+                np.sqrt(variance, out=shock)
+                shock *= out[:, step]
+                out[:, step] = shock
+                variance *= self.beta
+                variance += self.omega + self.alpha * shock ** 2
+        else:
+            omega, alpha, beta = self.omega, self.alpha, self.beta
+            for path in out:
+                variance = initial_variance
+                shocks = path.tolist()
+                for step, z in enumerate(shocks):
+                    shock = z * variance ** 0.5
+                    shocks[step] = shock
+                    variance = omega + alpha * shock * shock + beta * variance
+                path[:] = shocks
+        out += self.mu
+        np.exp(out, out=out)
+
+
+def generate_paths(n_paths, n_steps, model=None, initial_price=100, seed=None, out=None):
+    """Generate ``n_paths`` price paths of ``n_steps`` prices each, starting at ``initial_price``.
+
+    Returns are drawn in bulk and turned into prices with one cumulative product, written into
+    ``out`` (a preallocated or shared ``(n_paths, n_steps)`` float64 array) when given. ``seed``
+    may be an int or a ``numpy.random.Generator``.
+    """
+    model = model or GeometricBrownianMotion()
+    rng = np.random.default_rng(seed)
+    if out is None:
+        out = np.empty((n_paths, n_steps))
+    elif out.shape != (n_paths, n_steps) or out.dtype != np.float64 or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous float64 array of shape {(n_paths, n_steps)}")
+    if n_steps == 0:
+        return out
+    model.fill_returns(rng, out)
+    out[:, 0] = initial_price
+    np.cumprod(out, axis=1, out=out)
+    return out
+
+
+def shared_paths(n_paths, n_steps, model=None, initial_price=100, seed=None, name=None):
+    """Generate paths straight into a new shared memory block so worker processes can attach to it.
+
+    Returns the ``SharedMemory`` (close and unlink it when done) and the array view on it.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, n_paths * n_steps * 8), name=name)
+    out = np.ndarray((n_paths, n_steps), dtype=np.float64, buffer=block.buf)
+    generate_paths(n_paths, n_steps, model, initial_price, seed, out)
+    return block, out
+
+
+def attach_shared_paths(name, n_paths, n_steps):
+    """Attach to paths created by ``shared_paths`` in another process."""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray((n_paths, n_steps), dtype=np.float64, buffer=block.buf)
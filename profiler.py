@@ -0,0 +1,147 @@
+import os
+import sys
+import signal
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler and allocation tracker for the bot's main loop.
+
+    A background thread periodically samples the stack of the profiled thread while a
+    cycle is running. At the end of every cycle the collapsed stacks are written to
+    ``cycle-NNNNNN.folded`` (flamegraph format) and every ``snapshot_every`` cycles a
+    tracemalloc snapshot is diffed against the previous one into ``cycle-NNNNNN.alloc.txt``.
+    """
+
+    def __init__(self, output_dir, sample_interval=0.01, snapshot_every=10, top_n=25, thread_id=None, traceback_depth=1):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.snapshot_every = snapshot_every
+        self.top_n = top_n
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.traceback_depth = traceback_depth
+        self.enabled = False
+        self.cycle = 0
+        self._samples = Counter()
+        self._lock = threading.Lock()
+        self._in_cycle = False
+        self._toggle_requested = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._previous_snapshot = None
+
+    def start(self):
+        """Start sampling and allocation tracking."""
+        if self.enabled:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_depth)
+        self._previous_snapshot = self._take_snapshot()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        self.enabled = True
+        logging.info(f"Profiler started, writing artifacts to {self.output_dir}")
+
+    def stop(self):
+        """Stop sampling and allocation tracking, flushing any pending samples."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._flush_samples(os.path.join(self.output_dir, f"cycle-{self.cycle + 1:06d}.partial.folded"))
+        self._previous_snapshot = None
+        tracemalloc.stop()
+        logging.info("Profiler stopped")
+
+    def toggle(self):
+        """Switch profiling on or off."""
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
+
+    def request_toggle(self):
+        """Ask for a toggle at the next cycle boundary; safe to call from a signal handler."""
+        self._toggle_requested = True
+
+    def install_signal_handler(self, signum=None):
+        """Toggle profiling whenever the process receives ``signum`` (SIGUSR1 by default).
+
+        The handler only records the request: starting or stopping joins threads, writes files
+        and takes locks the interrupted code may hold, so it happens at the next cycle boundary.
+        """
+        signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            logging.warning("Signal based profiler control is not available on this platform")
+            return
+        signal.signal(signum, lambda *_: self.request_toggle())
+
+    def _apply_requested_toggle(self):
+        if self._toggle_requested:
+            self._toggle_requested = False
+            self.toggle()
+
+    def cycle_start(self):
+        """Mark the beginning of a bot cycle; only time inside cycles is sampled."""
+        self._apply_requested_toggle()
+        self._in_cycle = True
+
+    def cycle_end(self):
+        """Mark the end of a bot cycle and write this cycle's artifacts."""
+        self._in_cycle = False
+        if self.enabled:
+            self.cycle += 1
+            self._flush_samples(self._artifact_path("folded"))
+            if self.snapshot_every and self.cycle % self.snapshot_every == 0:
+                self._write_allocation_diff(self._artifact_path("alloc.txt"))
+        self._apply_requested_toggle()
+
+    def _artifact_path(self, suffix):
+        return os.path.join(self.output_dir, f"cycle-{self.cycle:06d}.{suffix}")
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.sample_interval):
+            if not self._in_cycle:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            with self._lock:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def _flush_samples(self, path):
+        with self._lock:
+            samples, self._samples = self._samples, Counter()
+        if not samples:
+            return
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def _write_allocation_diff(self, path):
+        snapshot = self._take_snapshot()
+        stats = snapshot.compare_to(self._previous_snapshot, "lineno")
+        self._previous_snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        with open(path, "w") as f:
+            f.write(f"# cycle {self.cycle}: traced {current} bytes, peak {peak} bytes\n")
+            for stat in stats[:self.top_n]:
+                f.write(f"{stat}\n")
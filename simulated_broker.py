@@ -0,0 +1,261 @@
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+from alpaca.trading.enums import OrderStatus
+from get_market_data import GetMarketData
+
+
+class SimulatedClock:
+    """Virtual clock so simulated order latency costs no wall-clock time."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class SimulatedExchange:
+    """In-process exchange that fills orders against the last replayed price.
+
+    Orders resolve ``fill_latency`` virtual seconds after submission. During that time the
+    price drifts by up to ``slippage_bps`` basis points. Market orders fill at the drifted
+    price. Limit orders are cancelled unless the drifted price still crosses their limit,
+    and otherwise fill at it, capped at the limit. A ``reject_rate`` share of orders is
+    rejected outright and a ``partial_fill_rate`` share only fills part of the quantity
+    before the remainder is cancelled.
+    """
+
+    def __init__(self, fill_latency=0.0, partial_fill_rate=0.0, reject_rate=0.0, slippage_bps=0.0, seed=None, clock=None):
+        self.fill_latency = fill_latency
+        self.partial_fill_rate = partial_fill_rate
+        self.reject_rate = reject_rate
+        self.slippage_bps = slippage_bps
+        self.rng = random.Random(seed)
+        self.clock = clock or SimulatedClock()
+        self.last_prices = {}
+        self.positions = {}
+        self.fills = []
+        self.next_order_id = 1
+
+    def update_price(self, symbol, price):
+        self.last_prices[symbol] = price
+
+    def submit(self, symbol, quantity, action, is_market, limit_price=None):
+        """Accept an order for later execution, or return None for an unknown symbol."""
+        if symbol not in self.last_prices:
+            return None
+        order = SimulatedOrder(self.next_order_id, symbol, quantity, action, is_market, limit_price, self.clock.now + self.fill_latency)
+        self.next_order_id += 1
+        return order
+
+    def resolve(self, order):
+        """Advance the clock to the order's fill time and decide its outcome."""
+        if order.done:
+            return order
+        self.clock.now = max(self.clock.now, order.fill_time)
+        order.done = True
+        if self.rng.random() < self.reject_rate:
+            order.status = "rejected"
+            return order
+
+        direction = 1 if order.action == "BUY" else -1
+        drift = self.rng.uniform(-self.slippage_bps, self.slippage_bps) / 10000
+        price = self.last_prices[order.symbol] * (1 + drift)
+        if not order.is_market:
+            if (price - order.limit_price) * direction > 0:
+                order.status = "cancelled"
+                return order
+            # A marketable limit fills at the market, never worse than its limit
+            price = min(price, order.limit_price) if direction > 0 else max(price, order.limit_price)
+
+        quantity = order.quantity
+        if quantity > 1 and self.rng.random() < self.partial_fill_rate:
+            quantity = self.rng.randint(1, int(quantity) - 1)
+        order.filled_qty = quantity
+        order.avg_fill_price = price
+        order.status = "filled" if quantity == order.quantity else "cancelled"
+        self.positions[order.symbol] = self.positions.get(order.symbol, 0) + direction * quantity
+        self.fills.append((self.clock.now, order.symbol, order.action, quantity, price))
+        return order
+
+
+class SimulatedOrder:
+    def __init__(self, order_id, symbol, quantity, action, is_market, limit_price, fill_time):
+        self.id = order_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.action = action
+        self.is_market = is_market
+        self.limit_price = limit_price
+        self.fill_time = fill_time
+        self.done = False
+        self.status = "submitted"
+        self.filled_qty = 0
+        self.avg_fill_price = None
+
+
+class SimulatedIBStatus:
+    def __init__(self, order):
+        self._order = order
+
+    @property
+    def status(self):
+        return {"submitted": "Submitted", "filled": "Filled", "cancelled": "Cancelled", "rejected": "Inactive"}[self._order.status]
+
+    @property
+    def filled(self):
+        return self._order.filled_qty
+
+    @property
+    def avgFillPrice(self):
+        return self._order.avg_fill_price or 0.0
+
+
+class SimulatedIBOrder:
+    """Stand-in for an ib_insync Order: only what was requested, fills are reported on the trade's orderStatus."""
+
+    def __init__(self, order):
+        self.orderId = order.id
+        self.action = order.action
+        self.totalQuantity = order.quantity
+        self.orderType = "MKT" if order.is_market else "LMT"
+        self.lmtPrice = order.limit_price
+
+
+class SimulatedIBTrade:
+    """Stand-in for an ib_insync Trade as consumed by ZoneRecoveryBot."""
+
+    def __init__(self, order):
+        self.sim_order = order
+        self.order = SimulatedIBOrder(order)
+        self.orderStatus = SimulatedIBStatus(order)
+
+    def isDone(self):
+        return self.sim_order.done
+
+
+class SimulatedIBClient:
+    """Drop-in replacement for IBClient that trades on a SimulatedExchange."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+    def place_order(self, symbol, quantity, limit_price, action, is_market):
+        order = self.exchange.submit(symbol, quantity, action, is_market, limit_price)
+        if order is None:
+            logging.error(f"No valid contract found for {symbol} on any exchange.")
+            return None
+        return SimulatedIBTrade(order)
+
+    def monitor_order(self, trade):
+        self.exchange.resolve(trade.sim_order)
+        return trade.order
+
+    def stop(self):
+        pass
+
+
+class SimulatedAlpacaOrder:
+    """Stand-in for an Alpaca order as consumed by ZoneRecoveryBot."""
+
+    def __init__(self, order):
+        self.id = order.id
+        self.symbol = order.symbol
+        self.qty = order.quantity
+        self.limit_price = order.limit_price
+        self.status = {"submitted": OrderStatus.NEW, "filled": OrderStatus.FILLED,
+                       "cancelled": OrderStatus.CANCELED, "rejected": OrderStatus.REJECTED}[order.status]
+        self.filled_qty = order.filled_qty
+        self.filled_avg_price = order.avg_fill_price
+
+
+class SimulatedAlpacaClient:
+    """Drop-in replacement for AlpacaClient that trades on a SimulatedExchange."""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.orders = {}
+
+    def place_order(self, symbol, quantity, action, is_market, limit_price=None):
+        order = self.exchange.submit(symbol, quantity, action, is_market, limit_price)
+        if order is None:
+            raise ValueError(f"asset {symbol} not found")
+        self.orders[order.id] = order
+        return SimulatedAlpacaOrder(order)
+
+    def monitor_order(self, order):
+        return SimulatedAlpacaOrder(self.exchange.resolve(self.orders.pop(order.id)))
+
+
+class ReplayMarketData(GetMarketData):
+    """GetMarketData stand-in that replays recorded or synthetic bars one per request.
+
+    ``bars`` maps each symbol to a chronological list of ``(price, timestamp, volume)``
+    tuples, or to StoredBars memory-mapped from a BarStore. The first ``history`` bars are
+    served as initial data, and every ``fetch_latest_price`` call advances that symbol by
+    one bar and publishes the price to the exchange so simulated orders fill against it.
+    """
+
+    def __init__(self, bars, exchange=None, history=30):
+        super().__init__()
+        self.bars = bars
+        self.exchange = exchange
+        self.cursors = {symbol: min(history, len(symbol_bars)) - 1 for symbol, symbol_bars in bars.items()}
+        for symbol in bars:
+            self._publish(symbol)
+
+    @classmethod
+    def from_prices(cls, prices_by_symbol, exchange=None, history=30, start="2021-01-04 09:30:00", volume=1000):
+        """Build a replay from plain price lists, stamping consecutive 1-minute bars."""
+        start = datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+        bars = {
+            symbol: [(float(price), (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"), volume) for i, price in enumerate(prices)]
+            for symbol, prices in prices_by_symbol.items()
+        }
+        return cls(bars, exchange, history)
+
+    @classmethod
+    def from_store(cls, store, symbols=None, interval="1min", exchange=None, history=30):
+        """Replay memory-mapped bars from a BarStore without loading them into RAM."""
+        symbols = symbols or store.symbols(interval)
+        return cls({symbol: store.load(symbol, interval) for symbol in symbols}, exchange, history)
+
+    @property
+    def exhausted(self):
+        return all(self.cursors[symbol] >= len(self.bars[symbol]) - 1 for symbol in self.bars)
+
+    def _publish(self, symbol):
+        if self.exchange and self.cursors[symbol] >= 0:
+            self.exchange.update_price(symbol, self.bars[symbol][self.cursors[symbol]][0])
+
+    def get_potential_candidates(self, price_limit=10, bar_aggregator=None, timeframe="1day"):
+        return []
+
+    def fetch_initial_data(self, symbol, interval="1min", period=30, mode="realtime", series="TIME_SERIES_INTRADAY"):
+        if symbol not in self.bars:
+            return [], []
+        window = self.bars[symbol][max(0, self.cursors[symbol] + 1 - period):self.cursors[symbol] + 1]
+        return [(price, timestamp) for price, timestamp, _ in window], [volume for _, _, volume in window]
+
+    def fetch_latest_price(self, symbol, interval="1min", mode="realtime"):
+        if symbol not in self.bars or self.cursors[symbol] < 0:
+            return None, None, None
+        if self.cursors[symbol] < len(self.bars[symbol]) - 1:
+            self.cursors[symbol] += 1
+            self._publish(symbol)
+        return self.bars[symbol][self.cursors[symbol]]
+
+
+def run_simulated_session(bot, replay, max_cycles=None):
+    """Drive ``bot.run_cycle`` until the replay is exhausted and report throughput."""
+    cycles = 0
+    ticks = sum(replay.cursors.values())
+    started = time.perf_counter()
+    while not replay.exhausted and (max_cycles is None or cycles < max_cycles):
+        bot.run_cycle()
+        cycles += 1
+    elapsed = time.perf_counter() - started
+    ticks = sum(replay.cursors.values()) - ticks
+    return {"cycles": cycles, "ticks": ticks, "elapsed": elapsed, "ticks_per_second": ticks / elapsed if elapsed else float("inf")}
@@ -0,0 +1,165 @@
+import os
+import math
+import numpy as np
+
+TRADE_LOG_COLUMNS = (("run_id", np.int64), ("entry_step", np.int64), ("exit_step", np.int64), ("legs", np.int32), ("profit", np.float64))
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (Jain & Chlamtac's P-square algorithm)."""
+
+    def __init__(self, quantile):
+        self.quantile = quantile
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+        for i in range(cell + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Nudge the three middle markers towards their desired positions
+        for i in range(1, 4):
+            offset = self.desired[i] - self.positions[i]
+            if (offset >= 1 and self.positions[i + 1] - self.positions[i] > 1) or (offset <= -1 and self.positions[i - 1] - self.positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (self.positions[i + step] - self.positions[i])
+                heights[i] = height
+                self.positions[i] += step
+
+    def _parabolic(self, i, step):
+        n, q = self.positions, self.heights
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self):
+        if not self.heights:
+            return math.nan
+        if len(self.heights) < 5:
+            # Too few samples for the markers, fall back to the exact quantile
+            return float(np.quantile(self.heights, self.quantile))
+        return self.heights[2]
+
+
+class StreamingStats:
+    """Constant-memory summary of trade profits: count, mean, variance, quantiles, drawdown and win rate."""
+
+    def __init__(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.wins = 0
+        self.total = 0.0
+        self._peak = 0.0
+        self.max_drawdown = 0.0
+        self._quantiles = {q: P2Quantile(q) for q in quantiles}
+
+    def add(self, profit):
+        # Welford's update keeps the variance numerically stable over long runs
+        self.count += 1
+        delta = profit - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (profit - self.mean)
+        self.min = min(self.min, profit)
+        self.max = max(self.max, profit)
+        if profit > 0:
+            self.wins += 1
+        # Drawdown of the cumulative profit curve, trade by trade
+        self.total += profit
+        self._peak = max(self._peak, self.total)
+        self.max_drawdown = max(self.max_drawdown, self._peak - self.total)
+        for estimator in self._quantiles.values():
+            estimator.add(profit)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        return self._quantiles[q].value()
+
+    def summary(self):
+        summary = {
+            "count": self.count, "mean": self.mean, "std": self.std, "min": self.min, "max": self.max,
+            "total": self.total, "win_rate": self.win_rate, "max_drawdown": self.max_drawdown,
+        }
+        summary.update({f"p{round(q * 100):02d}": estimator.value() for q, estimator in self._quantiles.items()})
+        return summary
+
+
+class TradeLogWriter:
+    """Buffered per-trade log written as one raw binary file per column.
+
+    Columns are run id, entry step, exit step, leg count and profit. Rows are collected in
+    fixed-size numpy buffers and appended to ``<directory>/<column>.bin`` when a buffer fills.
+    """
+
+    def __init__(self, directory, buffer_size=65536):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._buffers = {name: np.empty(buffer_size, dtype=dtype) for name, dtype in TRADE_LOG_COLUMNS}
+        self._size = 0
+
+    def write(self, run_id, entry_step, exit_step, legs, profit):
+        for name, value in zip(self._buffers, (run_id, entry_step, exit_step, legs, profit)):
+            self._buffers[name][self._size] = value
+        self._size += 1
+        if self._size == len(self._buffers["profit"]):
+            self.flush()
+
+    def flush(self):
+        if not self._size:
+            return
+        for name, buffer in self._buffers.items():
+            with open(os.path.join(self.directory, f"{name}.bin"), "ab") as f:
+                buffer[:self._size].tofile(f)
+        self._size = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trade_log(directory):
+    """Memory-map a trade log written by TradeLogWriter as a dict of column arrays."""
+    columns = {}
+    for name, dtype in TRADE_LOG_COLUMNS:
+        path = os.path.join(directory, f"{name}.bin")
+        columns[name] = np.memmap(path, dtype=dtype, mode="r") if os.path.exists(path) and os.path.getsize(path) else np.empty(0, dtype=dtype)
+    return columns
@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from bot import ZoneRecoveryBot
+from get_market_data import GetMarketData
+from simulated_broker import SimulatedExchange, SimulatedIBClient, SimulatedAlpacaClient
+
+
+class FakeMarketDataServer:
+    """Local HTTP server answering the Alpha Vantage queries GetMarketData makes with synthetic bars.
+
+    Each symbol follows its own seeded random walk and every intraday request returns one new
+    1-minute bar. run_soak serves it from a child process through FakeMarketDataProcess, and
+    PublishingMarketData forwards the prices to the simulated exchange so orders can fill.
+    """
+
+    def __init__(self, history=30, seed=0, host="127.0.0.1", port=0):
+        self.history = history
+        self.seed = seed
+        self.start_time = datetime(2021, 1, 4, 9, 30)
+        self._symbols = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                body = json.dumps(server.respond(params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-market-data", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _symbol_state(self, symbol):
+        if symbol not in self._symbols:
+            rng = random.Random(f"{self.seed}-{symbol}")
+            self._symbols[symbol] = {"rng": rng, "price": rng.uniform(5, 500), "minute": 0}
+        return self._symbols[symbol]
+
+    def respond(self, params):
+        function = params.get("function")
+        with self._lock:
+            self.requests += 1
+            if function == "TOP_GAINERS_LOSERS":
+                return {"top_gainers": [], "top_losers": [], "most_actively_traded": []}
+            state = self._symbol_state(params.get("symbol", ""))
+            if function == "TIME_SERIES_DAILY":
+                rng = random.Random(f"{self.seed}-{params.get('symbol')}-daily")
+                price, series = state["price"], {}
+                for day in range(self.history, 0, -1):
+                    series[(self.start_time - timedelta(days=day)).strftime("%Y-%m-%d")] = {"4. close": f"{price:.4f}", "5. volume": str(rng.randint(1000, 100000))}
+                    price *= 1 + rng.gauss(0, 0.02)
+                return {"Time Series (Daily)": series}
+            if function == "TIME_SERIES_INTRADAY":
+                state["minute"] += 1
+                state["price"] *= 1 + state["rng"].gauss(0, 0.002)
+                timestamp = (self.start_time + timedelta(minutes=state["minute"])).strftime("%Y-%m-%d %H:%M:%S")
+                return {"Time Series (1min)": {timestamp: {"4. close": f"{state['price']:.4f}", "5. volume": str(state["rng"].randint(100, 10000))}}}
+        return {}
+
+
+def _serve(connection, history, seed):
+    server = FakeMarketDataServer(history=history, seed=seed).start()
+    connection.send(server.url)
+    connection.recv()  # any message asks the server to stop
+    server.stop()
+    connection.send(server.requests)
+
+
+class FakeMarketDataProcess:
+    """Run a FakeMarketDataServer in a child process, so its per-symbol state and handler threads
+    do not count towards the RSS measured for the bot."""
+
+    def __init__(self, history=30, seed=0, start_method="spawn"):
+        self.history = history
+        self.seed = seed
+        self.context = multiprocessing.get_context(start_method)
+        self.url = None
+        self.requests = 0
+        self._connection = None
+        self._process = None
+
+    def start(self):
+        self._connection, child_connection = self.context.Pipe()
+        self._process = self.context.Process(target=_serve, args=(child_connection, self.history, self.seed),
+                                             name="fake-market-data", daemon=True)
+        self._process.start()
+        self.url = self._connection.recv()
+        return self
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._connection.send("stop")
+        self.requests = self._connection.recv()
+        self._process.join()
+        self._process = None
+
+
+class PublishingMarketData(GetMarketData):
+    """GetMarketData that publishes every price it receives to the simulated exchange, so orders can fill
+    while the fake server runs in another process."""
+
+    def __init__(self, exchange, base_url):
+        super().__init__()
+        self.exchange = exchange
+        self.base_url = base_url
+
+    def fetch_latest_price(self, symbol, *args, **kwargs):
+        price, timestamp, volume = super().fetch_latest_price(symbol, *args, **kwargs)
+        if price:
+            self.exchange.update_price(symbol, price)
+        return price, timestamp, volume
+
+
+def current_rss():
+    """Resident set size of this process in bytes (Linux), falling back to the peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return peak_rss()
+
+
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate memory held by nested dicts, lists and scalars."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def run_soak(num_symbols=2000, cycles=50, history=30, seed=0, report_every=10):
+    """Run ``cycles`` bot cycles over ``num_symbols`` synthetic tickers and measure scaling."""
+    exchange = SimulatedExchange(seed=seed)
+    server = FakeMarketDataProcess(history=history, seed=seed).start()
+    try:
+        market_data_service = PublishingMarketData(exchange, server.url)
+        tickers = [f"T{i:05d}" for i in range(num_symbols)]
+        baseline_rss = current_rss()
+        bot = ZoneRecoveryBot(tickers, SimulatedIBClient(exchange), SimulatedAlpacaClient(exchange),
+                              market_data_service=market_data_service, scan_candidates=False)
+
+        cycle_times, rss_samples = [], []
+        for cycle in range(cycles):
+            started = time.perf_counter()
+            bot.run_cycle()
+            cycle_times.append(time.perf_counter() - started)
+            rss_samples.append(current_rss())
+            if report_every and (cycle + 1) % report_every == 0:
+                print(f"cycle {cycle + 1}/{cycles}: {cycle_times[-1]:.3f}s, rss {rss_samples[-1] / 2**20:.1f} MiB", flush=True)
+
+        state_bytes = deep_sizeof(bot.stocks_to_check)
+        cycle_times = np.array(cycle_times)
+        server.stop()  # for its request count
+        rss = np.array(rss_samples, dtype=float)
+        # Skip the first cycle, which loads every symbol's history, when fitting the growth trend
+        steady = rss[1:] if len(rss) > 2 else rss
+        growth_per_cycle = float(np.polyfit(np.arange(len(steady)), steady, 1)[0]) if len(steady) > 1 else 0.0
+        return {
+            "symbols": num_symbols,
+            "cycles": cycles,
+            "requests": server.requests,
+            "cycle_seconds": {
+                "p50": float(np.percentile(cycle_times, 50)),
+                "p90": float(np.percentile(cycle_times, 90)),
+                "p99": float(np.percentile(cycle_times, 99)),
+                "max": float(cycle_times.max()),
+                "first": float(cycle_times[0]),
+            },
+            "seconds_per_symbol": float(np.median(cycle_times) / num_symbols),
+            "peak_rss_bytes": peak_rss(),
+            "rss_bytes": {"before_bot": baseline_rss, "after_first_cycle": int(rss[0]), "final": int(rss[-1])},
+            "rss_growth_bytes_per_cycle": growth_per_cycle,
+            "state_bytes": state_bytes,
+            "state_bytes_per_symbol": state_bytes / num_symbols,
+            "rss_bytes_per_symbol": (rss[-1] - baseline_rss) / num_symbols,
+            "fills": len(exchange.fills),
+            "total_session_profit": bot.total_session_profit,
+        }
+    finally:
+        server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test the bot over a large synthetic watchlist with a local fake market data server.')
+    parser.add_argument('--symbols', type=int, default=2000, help='Number of synthetic tickers to watch')
+    parser.add_argument('--cycles', type=int, default=50, help='Number of bot cycles to run')
+    parser.add_argument('--history', type=int, default=30, help='Daily bars served as initial history')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic prices and fills')
+    parser.add_argument('--output', default=None, metavar='FILE', help='Write the report to FILE as JSON')
+    args = parser.parse_args()
+
+    # Per-tick INFO logs would dominate both cycle time and output
+    logging.disable(logging.INFO)
+    report = run_soak(args.symbols, args.cycles, args.history, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
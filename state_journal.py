@@ -0,0 +1,163 @@
+import os
+import json
+import logging
+
+SNAPSHOT_FILE = "snapshot.json"
+JOURNAL_FILE = "journal.jsonl"
+
+
+class StateJournal:
+    """Append-only journal of the bot's per-stock state with periodic compact snapshots.
+
+    Every mutation of ``stocks_to_check`` (initial fetches, bar appends, fills, resets and
+    RSI updates) is appended as one JSON line tagged with an increasing sequence number,
+    after the caller has applied it to the attached state. Every ``snapshot_every`` records
+    the attached state is written atomically to a snapshot and the journal is truncated, so
+    recovery only has to replay a short tail. A record torn by a crash mid-write is ignored.
+    """
+
+    def __init__(self, directory, snapshot_every=1000, fsync=False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.state = {}
+        self.seq = 0
+        self._records_since_snapshot = 0
+        self._journal = None
+
+    def recover(self):
+        """Rebuild state from the latest snapshot plus the journal tail and open the journal for appending."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.state, self.seq = {}, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            self.state, self.seq = snapshot["state"], snapshot["seq"]
+
+        replayed = 0
+        valid_bytes = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("missing record terminator")
+                        record = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Discarding torn journal record at byte {valid_bytes}")
+                        break
+                    valid_bytes += len(line)
+                    if record["seq"] <= self.seq:
+                        continue
+                    apply_record(self.state, record)
+                    self.seq = record["seq"]
+                    replayed += 1
+            # Drop a torn tail so new records are not appended after garbage
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        self._records_since_snapshot = replayed
+        self._journal = open(self.journal_path, "a")
+        logging.info(f"Recovered {len(self.state)} stocks at journal sequence {self.seq} ({replayed} records replayed)")
+        return self.state
+
+    def attach(self, state):
+        """Track ``state`` (the live ``stocks_to_check`` dict) and snapshot it as the new baseline."""
+        self.state = state
+        self.snapshot()
+
+    def record(self, op, symbol, **fields):
+        """Append one state mutation that has already been applied to the attached state."""
+        self.seq += 1
+        record = {"seq": self.seq, "op": op, "symbol": symbol, **fields}
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        self._records_since_snapshot += 1
+        if self.snapshot_every and self._records_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def record_fetch(self, symbol, prices, timestamps, volumes, previous_rsi):
+        self.record("fetch", symbol, prices=prices, timestamps=timestamps, volumes=volumes, previous_rsi=previous_rsi)
+
+    def record_bar(self, symbol, price, timestamp, volume):
+        self.record("bar", symbol, price=price, timestamp=timestamp, volume=volume)
+
+    def record_fill(self, symbol, side, price, qty):
+        self.record("fill", symbol, side=side, price=price, qty=qty)
+
+    def record_rsi(self, symbol, previous_rsi):
+        self.record("rsi", symbol, previous_rsi=previous_rsi)
+
+    def record_reset(self, symbol):
+        self.record("reset", symbol)
+
+    def record_unfetched(self, symbol):
+        self.record("unfetched", symbol)
+
+    def record_adopt(self, symbol, stock_state):
+        self.record("adopt", symbol, state=stock_state)
+
+    def record_release(self, symbol):
+        self.record("release", symbol)
+
+    def snapshot(self):
+        """Write the full state atomically and start a fresh journal."""
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"seq": self.seq, "state": self.state}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Records up to self.seq are covered by the snapshot, so the journal can be emptied
+        self._journal.close()
+        self._journal = open(self.journal_path, "w")
+        self._records_since_snapshot = 0
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+
+def new_stock_state():
+    return {"fetched": False, "prices": [], "volumes": [], "long": [], "short": []}
+
+
+def apply_record(state, record):
+    """Apply a single journal record to a ``stocks_to_check`` style state dict."""
+    op = record["op"]
+    # Symbols handed over between worker processes move with their whole state
+    if op == "adopt":
+        state[record["symbol"]] = record["state"]
+        return
+    if op == "release":
+        state.pop(record["symbol"], None)
+        return
+    stock = state.setdefault(record["symbol"], new_stock_state())
+    if op == "fetch":
+        stock["prices"].extend(record["prices"])
+        stock["timestamps"] = list(record["timestamps"])
+        stock["volumes"].extend(record["volumes"])
+        stock["fetched"] = True
+        stock["previous_rsi"] = record["previous_rsi"]
+    elif op == "bar":
+        # Bars slide the fixed-size history window, mirroring ZoneRecoveryBot.run_cycle
+        for field, value in (("prices", record["price"]), ("timestamps", record["timestamp"]), ("volumes", record["volume"])):
+            stock[field].append(value)
+            stock[field].pop(0)
+    elif op == "fill":
+        stock[record["side"]].append({"price": record["price"], "qty": record["qty"]})
+    elif op == "rsi":
+        stock["previous_rsi"] = record["previous_rsi"]
+    elif op == "reset":
+        for field in ("prices", "timestamps", "volumes", "long", "short"):
+            stock[field] = []
+        stock["fetched"] = False
+    elif op == "unfetched":
+        stock["fetched"] = False
+    else:
+        raise ValueError(f"Unknown journal operation: {op}")
@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pytest
+from bar_aggregator import BarAggregator
+from state_journal import StateJournal
+from bot import ZoneRecoveryBot
+from get_market_data import GetMarketData
+from simulated_broker import SimulatedExchange, SimulatedIBClient, SimulatedAlpacaClient, ReplayMarketData, run_simulated_session
+from zone_recovery_logic import ZoneRecoveryLogic
+
+def minute(i):
+    return str(np.datetime64('2021-01-04T09:30:00') + np.timedelta64(i, 'm')).replace('T', ' ')
+
+def test_builds_ohlcv_bars_incrementally():
+    aggregator = BarAggregator(timeframes=('5min', '60min'))
+    prices = [10, 12, 9, 11, 10, 13, 14]
+    completed = [aggregator.add_bar('AAPL', minute(i), price, 100) for i, price in enumerate(prices)]
+
+    # 09:30-09:34 completes when the 09:35 bar arrives
+    assert completed[:5] == [[]] * 5
+    assert completed[5] == [('5min', {'start': completed[5][0][1]['start'], 'open': 10, 'high': 12, 'low': 9, 'close': 10, 'volume': 500})]
+    assert aggregator.history('AAPL', '5min') == ([(10, '2021-01-04 09:30:00')], [500])
+
+    partial = aggregator.bars('AAPL', '5min', include_partial=True)[-1]
+    assert (partial['open'], partial['high'], partial['low'], partial['close'], partial['volume']) == (13, 14, 13, 14, 200)
+    assert aggregator.closes('AAPL', '5min') == [10, 14]
+    assert aggregator.closes('AAPL', '60min', include_partial=False) == []
+    assert aggregator.closes('AAPL', '60min') == [14]
+
+def test_ignores_repeated_and_stale_bars():
+    aggregator = BarAggregator(timeframes=('5min',))
+    aggregator.add_bar('AAPL', minute(0), 10, 100)
+    aggregator.add_bar('AAPL', minute(0), 10, 100)
+    aggregator.add_bar('AAPL', minute(1), 11, 100)
+    assert aggregator.add_bar('AAPL', minute(0), 99, 100) == []
+    assert aggregator.bars('AAPL', '5min', include_partial=True)[0]['volume'] == 200
+
+def test_keeps_only_max_bars():
+    aggregator = BarAggregator(timeframes=('5min',), max_bars=3)
+    for i in range(60):
+        aggregator.add_bar('AAPL', minute(i), float(i), 1)
+    assert aggregator.closes('AAPL', '5min', include_partial=False) == [44.0, 49.0, 54.0]
+
+def test_seed_preloads_fetched_daily_history():
+    aggregator = BarAggregator()
+    aggregator.seed('AAPL', '1day', [(10.0, '2021-01-01'), (11.0, '2021-01-02'), (11.0, '2021-01-02')], [5, 6, 6])
+    aggregator.add_bar('AAPL', '2021-01-04 09:30:00', 12.0, 100)
+    assert aggregator.closes('AAPL', '1day') == [10.0, 11.0, 12.0]
+
+def test_unknown_timeframe_rejected():
+    with pytest.raises(ValueError):
+        BarAggregator(timeframes=('7min',))
+    with pytest.raises(ValueError):
+        BarAggregator(timeframes=('5min',)).closes('AAPL', '30min')
+
+@pytest.mark.parametrize('timeframe', ['1min', '30min'])
+def test_single_timeframe_aggregator(timeframe):
+    aggregator = BarAggregator(timeframes=(timeframe,))
+    aggregator.seed('AAPL', '1day', [(10.0, '2021-01-01')], [5])
+    for i in range(61):
+        aggregator.add_bar('AAPL', minute(i), float(i), 1)
+    assert aggregator.closes('AAPL', timeframe)[-1] == 60.0
+    assert len(aggregator.closes('AAPL', timeframe)) == (61 if timeframe == '1min' else 3)
+
+def test_logic_runs_rsi_on_supplied_prices():
+    logic = ZoneRecoveryLogic()
+    stock_data = {'prices': list(np.linspace(10, 20, 40)), 'long': [], 'short': []}
+    logic.calculate_rsi_and_check_profit(stock_data, 'AAPL', 20.0)
+    assert stock_data['previous_rsi'] == 100
+    logic.calculate_rsi_and_check_profit(stock_data, 'AAPL', 20.0, prices=list(np.linspace(20, 10, 40)))
+    assert stock_data['previous_rsi'] == 0
+    # Too few aggregated bars yet: no RSI and no entry signal
+    for short in ([20.0, 19.0], []):
+        assert logic.calculate_rsi_and_check_profit(stock_data, 'AAPL', 20.0, prices=short) is None
+        assert np.isnan(stock_data['previous_rsi'])
+
+def test_bot_trades_on_aggregated_bars():
+    rng = np.random.default_rng(5)
+    prices = {'AAPL': list(100 * np.cumprod(1 + rng.normal(0, 0.01, 400)))}
+    exchange = SimulatedExchange(seed=1)
+    replay = ReplayMarketData.from_prices(prices, exchange)
+    aggregator = BarAggregator(timeframes=('5min',))
+    bot = ZoneRecoveryBot(['AAPL'], SimulatedIBClient(exchange), SimulatedAlpacaClient(exchange),
+                          market_data_service=replay, scan_candidates=False, bar_aggregator=aggregator)
+    bot.logic.timeframe = '5min'
+
+    with patch.object(bot.logic, 'calculate_rsi_and_check_profit', wraps=bot.logic.calculate_rsi_and_check_profit) as check:
+        run_simulated_session(bot, replay)
+
+    assert len(aggregator.closes('AAPL', '5min')) == (400 - 30 + 4) // 5
+    assert check.call_args.args[3] == aggregator.closes('AAPL', '5min')
+
+def test_fetch_initial_data_reads_any_intraday_interval():
+    payload = {'Time Series (5min)': {'2021-01-04 09:35:00': {'4. close': '11.0', '5. volume': '20'},
+                                      '2021-01-04 09:30:00': {'4. close': '10.0', '5. volume': '10'}}}
+    response = MagicMock(json=MagicMock(return_value=payload), raise_for_status=MagicMock())
+    with patch('requests.get', return_value=response):
+        data, volumes = GetMarketData().fetch_initial_data('AAPL', '5min', 30, 'delayed', 'TIME_SERIES_INTRADAY')
+    assert data == [(10.0, '2021-01-04 09:30:00'), (11.0, '2021-01-04 09:35:00')]
+    assert volumes == [10, 20]
+
+def test_screener_uses_aggregated_bars_without_requests():
+    aggregator = BarAggregator(timeframes=('5min',))
+    for i, price in enumerate(np.linspace(5, 9, 60 * 5 + 1)):
+        aggregator.add_bar('PENNY', minute(i), float(price), 1000)
+    market_data = GetMarketData()
+    with patch.object(market_data, 'filter_stocks_by_price', return_value=['PENNY']), \
+         patch.object(market_data, 'fetch_initial_data') as fetch:
+        market_data.get_potential_candidates(bar_aggregator=aggregator, timeframe='5min')
+    fetch.assert_not_called()
+
+def test_restart_seeds_aggregated_bars_from_history(tmp_path):
+    exchange = SimulatedExchange(seed=1)
+    replay = ReplayMarketData.from_prices({'AAPL': list(np.linspace(100, 120, 200))}, exchange)
+    def make_bot():
+        bot = ZoneRecoveryBot(['AAPL'], SimulatedIBClient(exchange), SimulatedAlpacaClient(exchange), journal=StateJournal(str(tmp_path)),
+                              market_data_service=replay, scan_candidates=False, bar_aggregator=BarAggregator(timeframes=('15min',)))
+        bot.logic.timeframe = '15min'
+        return bot
+    bot = make_bot()
+    run_simulated_session(bot, replay, max_cycles=60)
+    bot.journal.close()
+
+    restarted = make_bot()
+    assert restarted.stocks_to_check['AAPL']['fetched']
+    assert not restarted.bar_aggregator.has_symbol('AAPL')
+    # 20 bars of the RSI timeframe, ending with the 11:00 bucket the next live bar falls into
+    history = [(110.0, f"2021-01-04 {(minute // 60):02d}:{(minute % 60):02d}:00") for minute in range(11 * 60 - 19 * 15, 11 * 60 + 1, 15)]
+    with patch.object(replay, 'fetch_initial_data', return_value=(history, [1000] * len(history))) as fetch:
+        restarted.run_cycle()
+    fetch.assert_called_once_with('AAPL', '15min', 30, 'delayed', 'TIME_SERIES_INTRADAY')
+    closes = restarted.bar_aggregator.closes('AAPL', '15min')
+    # The live 11:00 bar continues the seeded 11:00 bar rather than duplicating it
+    assert len(closes) == 20 and closes[-1] == replay.bars['AAPL'][replay.cursors['AAPL']][0]
+    assert not np.isnan(restarted.stocks_to_check['AAPL']['previous_rsi'])
+
+def test_screener_requests_history_for_unaggregated_timeframe():
+    aggregator = BarAggregator(timeframes=('15min',))
+    market_data = GetMarketData()
+    with patch.object(market_data, 'filter_stocks_by_price', return_value=['PENNY']), \
+         patch.object(market_data, 'fetch_initial_data', return_value=([], [])) as fetch:
+        market_data.get_potential_candidates(bar_aggregator=aggregator)
+    fetch.assert_called_once_with('PENNY', '1day', 365, 'delayed', 'TIME_SERIES_DAILY')
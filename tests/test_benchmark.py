@@ -0,0 +1,31 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from benchmark import build_benchmarks, run_benchmarks, compare_to_baseline, parse_thresholds, bench_bot_cycle
+from bot import ZoneRecoveryBot
+
+def test_every_benchmark_runs_offline(mocker):
+    requests_get = mocker.patch('requests.get', side_effect=AssertionError('benchmarks must not hit the network'))
+    results = run_benchmarks(build_benchmarks(scale=0.05, rounds=2), rounds=2)
+    assert len(results) == 12
+    assert all(result['rounds'] == 2 and 0 < result['min'] <= result['median'] <= result['max'] for result in results.values())
+    requests_get.assert_not_called()
+
+def test_every_bot_cycle_round_processes_a_new_bar(mocker):
+    run = bench_bot_cycle(3, calls=3)
+    checks = mocker.spy(ZoneRecoveryBot, 'check_and_execute_trades')
+    for expected in (3, 6, 9):
+        run()
+        assert checks.call_count == expected
+    with pytest.raises(RuntimeError):
+        run()
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = {'fast': {'median': 1.0}, 'slow': {'median': 1.0}, 'noisy': {'median': 1.0}}
+    results = {'fast': {'median': 0.5}, 'slow': {'median': 1.3}, 'noisy': {'median': 1.3}, 'new': {'median': 9.0}}
+    regressions = compare_to_baseline(results, baseline, threshold=0.25, thresholds=parse_thresholds(['noisy=0.5']))
+    assert regressions == [('slow', 1.0, 1.3, pytest.approx(1.3))]
+
+def test_parse_thresholds_allows_equals_in_names():
+    assert parse_thresholds(['logic.calculate_rsi_and_check_profit[legs=10]=0.4']) == {'logic.calculate_rsi_and_check_profit[legs=10]': 0.4}
@@ -0,0 +1,152 @@
+import sys
+import os
+import time
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from unittest.mock import MagicMock
+from bot import ZoneRecoveryBot
+from coordinator import ShardCoordinator, SharedRateLimiter, recover_worker_state
+from state_journal import StateJournal, new_stock_state
+from get_market_data import GetMarketData
+
+TICKERS = ['AAPL', 'GOOGL', 'TSLA', 'MSFT', 'AMZN', 'NVDA']
+
+class LocalMarketData(GetMarketData):
+    """Market data stand-in serving synthetic bars without any HTTP traffic."""
+    def __init__(self, rate_limiter=None):
+        super().__init__(rate_limiter=rate_limiter)
+        self.minute = 0
+
+    def _make_api_request(self, params):
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        if params['function'] == 'TIME_SERIES_DAILY':
+            return {"Time Series (Daily)": {f"2021-01-{day:02d}": {"4. close": str(100 + day), "5. volume": "1000"} for day in range(1, 31)}}
+        self.minute += 1
+        return {"Time Series (1min)": {f"2021-02-01 {self.minute // 60:02d}:{self.minute % 60:02d}:00": {"4. close": "120.0", "5. volume": "1000"}}}
+
+class ProfitBot(ZoneRecoveryBot):
+    """Books one unit of profit per processed bar, opens one worker-tagged leg per symbol and reports its watchlist."""
+    def __init__(self, worker_index, symbols, rate_limiter, journal, report_dir, crash_after=None):
+        super().__init__(symbols, MagicMock(), MagicMock(), journal=journal, market_data_service=LocalMarketData(rate_limiter),
+                         scan_candidates=False)
+        self.worker_index = worker_index
+        self.report_dir = report_dir
+        self.crash_after = crash_after
+        self.cycles = 0
+
+    def check_and_execute_trades(self, stock, current_price):
+        self.total_session_profit += 1
+        if not self.stocks_to_check[stock]['long']:
+            self.stocks_to_check[stock]['long'].append({'price': 1000 + self.worker_index, 'qty': 1})
+            self.journal.record_fill(stock, 'long', 1000 + self.worker_index, 1)
+
+    def run_cycle(self):
+        super().run_cycle()
+        self.cycles += 1
+        # Replace the report atomically so readers never see a half-written file
+        path = os.path.join(self.report_dir, f'worker-{self.worker_index}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({stock: [leg['price'] for leg in info['long']] for stock, info in self.stocks_to_check.items()}, f)
+        os.replace(path + '.tmp', path)
+        if self.crash_after is not None and self.cycles >= self.crash_after:
+            os._exit(1)
+
+class ProfitBotFactory:
+    def __init__(self, report_dir, crashing_worker=None):
+        self.report_dir = report_dir
+        self.crashing_worker = crashing_worker
+
+    def __call__(self, worker_index, symbols, rate_limiter, journal):
+        crash_after = 2 if worker_index == self.crashing_worker else None
+        return ProfitBot(worker_index, symbols, rate_limiter, journal, self.report_dir, crash_after)
+
+def read_legs(report_dir, worker_index):
+    path = os.path.join(report_dir, f'worker-{worker_index}.json')
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def read_watchlist(report_dir, worker_index):
+    return set(read_legs(report_dir, worker_index))
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+@pytest.fixture
+def make_coordinator(tmp_path):
+    coordinators = []
+    def factory(crashing_worker=None, num_workers=3, state_dir=None):
+        coordinator = ShardCoordinator(TICKERS, num_workers, bot_factory=ProfitBotFactory(str(tmp_path), crashing_worker),
+                                       requests_per_minute=60_000, data_update_interval=0.01,
+                                       scan_candidates=False, start_method='fork', state_dir=state_dir)
+        coordinators.append(coordinator)
+        return coordinator
+    yield factory
+    for coordinator in coordinators:
+        coordinator.stop()
+
+def test_shards_symbols_and_aggregates_profit(make_coordinator, tmp_path):
+    coordinator = make_coordinator()
+    coordinator.start()
+    assert coordinator.assignments == {0: ['AAPL', 'MSFT'], 1: ['GOOGL', 'AMZN'], 2: ['TSLA', 'NVDA']}
+    assert wait_for(lambda: coordinator.total_session_profit >= 30)
+    for worker_index, symbols in coordinator.assignments.items():
+        assert wait_for(lambda: read_watchlist(str(tmp_path), worker_index) == set(symbols))
+
+def test_dead_worker_symbols_move_to_survivors(make_coordinator, tmp_path):
+    coordinator = make_coordinator(crashing_worker=0)
+    coordinator.start()
+    assert wait_for(lambda: not coordinator.processes[0].is_alive())
+    assert coordinator.check_workers()
+
+    assert 0 not in coordinator.assignments
+    assert sorted(coordinator.assignments[1] + coordinator.assignments[2]) == sorted(TICKERS)
+    assert wait_for(lambda: read_watchlist(str(tmp_path), 1) | read_watchlist(str(tmp_path), 2) == set(TICKERS))
+
+def test_open_legs_move_with_their_symbols(make_coordinator, tmp_path):
+    state_dir = str(tmp_path / 'state')
+    coordinator = make_coordinator(crashing_worker=0, state_dir=state_dir)
+    coordinator.start()
+    assert wait_for(lambda: not coordinator.processes[0].is_alive())
+    assert coordinator.check_workers()
+
+    def survivor_legs():
+        legs = read_legs(str(tmp_path), 1)
+        legs.update(read_legs(str(tmp_path), 2))
+        return legs
+    # The dead worker's legs (tagged 1000) are adopted instead of being replaced by fresh ones
+    assert wait_for(lambda: survivor_legs().get('AAPL') == [1000] and survivor_legs().get('MSFT') == [1000])
+    assert wait_for(lambda: coordinator.check_workers() and not coordinator.pending)
+    assert recover_worker_state(os.path.join(state_dir, 'worker-0')) == {}
+
+def test_restart_keeps_journaled_symbols_with_their_worker(make_coordinator, tmp_path):
+    state_dir = str(tmp_path / 'state')
+    for worker_index, symbol in ((1, 'AAPL'), (5, 'NVDA')):
+        journal = StateJournal(os.path.join(state_dir, f'worker-{worker_index}'))
+        journal.recover()
+        journal.attach({symbol: dict(new_stock_state(), long=[{'price': 2000 + worker_index, 'qty': 1}])})
+        journal.close()
+
+    coordinator = make_coordinator(num_workers=2, state_dir=state_dir)
+    coordinator.start()
+    assert 'AAPL' in coordinator.assignments[1]
+    # Worker 5 no longer exists, so its journaled symbol is handed over with its leg
+    assert wait_for(lambda: {**read_legs(str(tmp_path), 0), **read_legs(str(tmp_path), 1)}.get('NVDA') == [2005])
+    assert read_legs(str(tmp_path), 1)['AAPL'] == [2001]
+
+def test_rate_limiter_enforces_shared_budget():
+    limiter = SharedRateLimiter(requests_per_minute=1200, burst=1)
+    started = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    # The first token is available immediately, the remaining ten arrive at 20 per second
+    assert time.monotonic() - started >= 0.45
@@ -0,0 +1,87 @@
+import sys
+import os
+import io
+import json
+import logging
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from log_setup import configure_logging, logging_config, restart_logging, SamplingFilter
+
+@pytest.fixture
+def configure():
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    listeners = []
+    def factory(**kwargs):
+        stream = io.StringIO()
+        listeners.append(configure_logging(stream=stream, **kwargs))
+        return listeners[-1], stream
+    yield factory
+    for listener in listeners:
+        listener.stop()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+def test_samples_per_symbol_messages(configure):
+    listener, stream = configure(sample_interval=3600)
+    for price in range(5):
+        logging.info("Latest price for %s: %s", "AAPL", price, extra={"sample_key": "AAPL"})
+        logging.info("Latest price for %s: %s", "MSFT", price, extra={"sample_key": "MSFT"})
+    logging.info("Unsampled message %s", 1)
+    logging.info("Unsampled message %s", 2)
+    listener.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert [line.split(' - ', 2)[2] for line in lines] == [
+        "Latest price for AAPL: 0", "Latest price for MSFT: 0", "Unsampled message 1", "Unsampled message 2",
+    ]
+
+def test_reports_suppressed_count_when_interval_elapses():
+    sampler = SamplingFilter(interval=60)
+    records = [logging.makeLogRecord({'msg': 'tick %s', 'args': (i,), 'sample_key': 'AAPL'}) for i in range(4)]
+    assert [sampler.filter(record) for record in records[:3]] == [True, False, False]
+    sampler._last_emitted[('AAPL', 'tick %s')] -= 61
+    assert sampler.filter(records[3])
+    assert records[3].suppressed == 2
+
+def test_formats_lazily_on_listener_thread(configure):
+    class Price:
+        formatted_on = None
+        def __str__(self):
+            import threading
+            Price.formatted_on = threading.current_thread().name
+            return "42"
+
+    listener, stream = configure(sample_interval=0)
+    logging.info("Latest price: %s", Price())
+    logging.debug("Debug arguments are never formatted: %s", Price())
+    listener.stop()
+    assert stream.getvalue().rstrip().endswith("Latest price: 42")
+    assert Price.formatted_on != 'MainThread'
+
+def test_structured_output(configure):
+    listener, stream = configure(structured=True)
+    logging.warning("No latest price data available for %s", "AAPL", extra={"sample_key": "AAPL"})
+    listener.stop()
+    entry = json.loads(stream.getvalue())
+    assert entry['level'] == 'WARNING'
+    assert entry['msg'] == "No latest price data available for AAPL"
+    assert entry['key'] == 'AAPL'
+
+def log_from_worker(config):
+    listener = restart_logging(config)
+    try:
+        logging.info("Worker record %s", 1)
+    finally:
+        listener.stop()
+
+def test_spawned_worker_logs_with_the_parent_config(configure, capfd):
+    configure(structured=True)
+    # A spawned child shares no logging state with the parent, only what it is passed
+    config = dict(logging_config(), stream=None)
+    process = multiprocessing.get_context('spawn').Process(target=log_from_worker, args=(config,))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+    assert json.loads(capfd.readouterr().err.splitlines()[-1])['msg'] == "Worker record 1"
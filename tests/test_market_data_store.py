@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from get_market_data import GetMarketData
+from market_data_store import BarRecorder, BarStore
+from simulated_broker import ReplayMarketData
+from trading_simulation import backtest_prices, run_replay_backtest
+
+intraday = {
+    "Time Series (1min)": {
+        "2021-01-04 09:30:00": {"4. close": "130.00", "5. volume": "1000"},
+        "2021-01-04 09:31:00": {"4. close": "131.00", "5. volume": "1100"},
+        "2021-01-04 09:32:00": {"4. close": "132.00", "5. volume": "1200"},
+    }
+}
+
+def test_capture_records_each_ingested_bar_once(tmp_path, mocker):
+    mocker.patch('requests.get', return_value=MagicMock(json=MagicMock(return_value=intraday), raise_for_status=MagicMock()))
+    market_data = GetMarketData(recorder=BarRecorder(str(tmp_path)))
+
+    market_data.fetch_initial_data('AAPL', '1min', 30)
+    market_data.fetch_latest_price('AAPL', '1min')  # same bar again, must not be duplicated
+
+    bars = BarStore(str(tmp_path)).load('AAPL', '1min')
+    assert isinstance(bars.closes, np.memmap)
+    assert list(bars.closes) == [130.0, 131.0, 132.0]
+    assert bars[:] == [(130.0, '2021-01-04 09:30:00', 1000), (131.0, '2021-01-04 09:31:00', 1100), (132.0, '2021-01-04 09:32:00', 1200)]
+
+def test_recorder_resumes_after_restart(tmp_path):
+    BarRecorder(str(tmp_path)).record('AAPL', '1day', [(1.0, '2021-01-04'), (2.0, '2021-01-05')], [10, 20])
+    added = BarRecorder(str(tmp_path)).record('AAPL', '1day', [(2.0, '2021-01-05'), (3.0, '2021-01-06')], [20, 30])
+    assert added == 1
+    assert BarStore(str(tmp_path)).load('AAPL', '1day')[-1] == (3.0, '2021-01-06', 30)
+
+@pytest.mark.parametrize('newest_first', [False, True])
+def test_import_csv(tmp_path, newest_first):
+    rows = [f"2020-01-{day:02d},{day},{day + 1},{day - 1},{100 + day},{day * 10}" for day in range(1, 11)]
+    if newest_first:
+        rows.reverse()
+    path = tmp_path / 'aapl.csv'
+    path.write_text("Date,Open,High,Low,Close,Volume\n" + "\n".join(rows) + "\n")
+
+    store = BarStore(str(tmp_path / 'store'))
+    assert store.import_csv(str(path), 'aapl', '1day', chunk_size=3) == 10
+    bars = store.load('AAPL', '1day')
+    assert list(bars.closes) == [100.0 + day for day in range(1, 11)]
+    assert list(bars.volumes) == [day * 10 for day in range(1, 11)]
+    assert store.symbols('1day') == ['AAPL']
+
+def test_replay_backtest_is_deterministic_and_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(3)
+    recorder = BarRecorder(str(tmp_path))
+    closes = {}
+    for symbol in ['AAPL', 'MSFT']:
+        closes[symbol] = 100 * np.cumprod(1 + rng.normal(0, 0.02, 400))
+        recorder.append_columns(symbol, '1min', np.arange(400) * 60, closes[symbol], np.full(400, 1000))
+
+    store = BarStore(str(tmp_path))
+    results = run_replay_backtest(store)
+    assert list(results) == ['AAPL', 'MSFT']
+    assert results == run_replay_backtest(store)
+    assert results['AAPL'] == backtest_prices(list(closes['AAPL']), window=30)
+
+    replay = ReplayMarketData.from_store(store, ['MSFT'])
+    assert replay.fetch_latest_price('MSFT') == (closes['MSFT'][30], '1970-01-01 00:30:00', 1000)
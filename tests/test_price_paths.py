@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from price_paths import (SimpleRandomWalk, GeometricBrownianMotion, JumpDiffusion, GarchVolatility,
+                         generate_paths, shared_paths, attach_shared_paths)
+from trading_simulation import simulate_stock_price
+
+MODELS = [SimpleRandomWalk(), GeometricBrownianMotion(), JumpDiffusion(), GarchVolatility()]
+
+@pytest.mark.parametrize('model', MODELS, ids=lambda model: type(model).__name__)
+@pytest.mark.parametrize('shape', [(200, 50), (3, 500)])
+def test_paths_are_seeded_and_start_at_initial_price(model, shape):
+    paths = generate_paths(*shape, model, initial_price=50, seed=42)
+    assert paths.shape == shape
+    assert np.all(paths[:, 0] == 50)
+    assert np.all(np.isfinite(paths)) and np.all(paths > 0)
+    assert np.array_equal(paths, generate_paths(*shape, model, initial_price=50, seed=np.random.default_rng(42)))
+    assert not np.array_equal(paths, generate_paths(*shape, model, initial_price=50, seed=43))
+
+def test_writes_into_preallocated_array():
+    out = np.zeros((4, 100))
+    assert generate_paths(4, 100, seed=1, out=out) is out
+    assert np.all(out > 0)
+    with pytest.raises(ValueError):
+        generate_paths(4, 100, out=np.zeros((100, 4)))
+
+def test_gbm_log_returns_match_parameters():
+    paths = generate_paths(2000, 251, GeometricBrownianMotion(mu=0.001, sigma=0.02), seed=7)
+    log_returns = np.diff(np.log(paths), axis=1)
+    assert log_returns.mean() == pytest.approx(0.001 - 0.5 * 0.02 ** 2, abs=1e-4)
+    assert log_returns.std() == pytest.approx(0.02, rel=0.01)
+
+def test_jumps_fatten_the_tails():
+    log_returns = np.diff(np.log(generate_paths(100, 5000, JumpDiffusion(jump_intensity=0.05, jump_std=0.1), seed=3)), axis=1).ravel()
+    kurtosis = np.mean((log_returns - log_returns.mean()) ** 4) / log_returns.var() ** 2
+    assert kurtosis > 5
+
+@pytest.mark.parametrize('shape', [(1, 200_000), (20_000, 10)])
+def test_garch_clusters_volatility(shape):
+    log_returns = np.diff(np.log(generate_paths(*shape, GarchVolatility(omega=1e-5, alpha=0.1, beta=0.85), seed=11)), axis=1)
+    squared = log_returns ** 2 - (log_returns ** 2).mean()
+    # Squared returns are positively autocorrelated when volatility clusters
+    autocorrelation = (squared[:, 1:] * squared[:, :-1]).mean() / squared.var()
+    assert autocorrelation > 0.05
+
+def test_shared_memory_paths_are_visible_to_attached_views():
+    block, paths = shared_paths(8, 64, seed=5)
+    try:
+        attached_block, attached = attach_shared_paths(block.name, 8, 64)
+        assert np.array_equal(attached, generate_paths(8, 64, seed=5))
+        del attached
+        attached_block.close()
+    finally:
+        del paths
+        block.close()
+        block.unlink()
+
+def test_simulate_stock_price_defaults_to_realistic_volatility():
+    prices = simulate_stock_price(250, seed=1)
+    assert len(prices) == 250 and prices[0] == 100
+    daily_moves = np.abs(np.diff(prices) / prices[:-1])
+    assert daily_moves.max() < 0.1
@@ -0,0 +1,78 @@
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from profiler import SamplingProfiler
+
+def busy_cycle(history):
+    # Churn some memory and burn CPU so both samplers have something to record
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        history.append([0] * 100)
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), sample_interval=0.001, snapshot_every=2)
+    yield profiler
+    profiler.stop()
+
+def test_writes_per_cycle_artifacts(profiler, tmp_path):
+    profiler.start()
+    history = []
+    for _ in range(4):
+        profiler.cycle_start()
+        busy_cycle(history)
+        profiler.cycle_end()
+
+    files = sorted(os.listdir(tmp_path))
+    assert [f for f in files if f.endswith('.folded')] == [f'cycle-00000{i}.folded' for i in range(1, 5)]
+    assert [f for f in files if f.endswith('.alloc.txt')] == ['cycle-000002.alloc.txt', 'cycle-000004.alloc.txt']
+    assert 'busy_cycle' in (tmp_path / 'cycle-000001.folded').read_text()
+    assert 'test_profiler.py' in (tmp_path / 'cycle-000002.alloc.txt').read_text()
+
+def test_toggle_pauses_collection(profiler, tmp_path):
+    profiler.start()
+    profiler.toggle()
+    assert not profiler.enabled
+    profiler.cycle_start()
+    busy_cycle([])
+    profiler.cycle_end()
+    assert os.listdir(tmp_path) == []
+
+    profiler.toggle()
+    profiler.cycle_start()
+    busy_cycle([])
+    profiler.cycle_end()
+    assert profiler.enabled
+    assert os.listdir(tmp_path) == ['cycle-000001.folded']
+
+def test_signal_only_requests_toggle_until_cycle_boundary(profiler, tmp_path):
+    import signal
+    profiler.install_signal_handler(signal.SIGUSR1)
+    try:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+        assert not profiler.enabled
+        profiler.cycle_start()
+        assert profiler.enabled
+        busy_cycle([])
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+        assert profiler.enabled
+        profiler.cycle_end()
+        assert not profiler.enabled
+        assert 'cycle-000001.folded' in os.listdir(tmp_path)
+    finally:
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+def test_failed_bot_cycle_still_ends_profiler_cycle(profiler, tmp_path):
+    from unittest.mock import MagicMock, patch
+    from bot import ZoneRecoveryBot
+    bot = ZoneRecoveryBot([], MagicMock(), MagicMock(), profiler=profiler, market_data_service=MagicMock(), scan_candidates=False)
+    profiler.start()
+    with patch.object(bot, 'run_cycle', side_effect=RuntimeError("market data down")):
+        with pytest.raises(RuntimeError):
+            bot.run_profiled_cycle()
+    assert not profiler._in_cycle
+    assert profiler.cycle == 1
@@ -0,0 +1,97 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from alpaca.trading.enums import OrderStatus
+from bot import ZoneRecoveryBot
+from simulated_broker import (SimulatedExchange, SimulatedIBClient, SimulatedAlpacaClient,
+                              ReplayMarketData, run_simulated_session)
+
+def random_walks(symbols, steps, seed=7):
+    rng = np.random.default_rng(seed)
+    return {symbol: list(100 * np.cumprod(1 + rng.normal(0, 0.01, steps))) for symbol in symbols}
+
+def build_bot(exchange, prices):
+    replay = ReplayMarketData.from_prices(prices, exchange)
+    bot = ZoneRecoveryBot(list(prices), SimulatedIBClient(exchange), SimulatedAlpacaClient(exchange),
+                          market_data_service=replay, scan_candidates=False)
+    return bot, replay
+
+def test_full_bot_loop_trades_faster_than_real_time():
+    exchange = SimulatedExchange(fill_latency=2.0, slippage_bps=5, seed=1)
+    bot, replay = build_bot(exchange, random_walks(['AAPL', 'GOOGL', 'TSLA'], 200))
+
+    stats = run_simulated_session(bot, replay)
+
+    assert replay.exhausted
+    assert stats['ticks'] == 3 * (200 - 30)
+    assert exchange.fills
+    assert bot.total_session_profit != 0
+    # Every fill waited out its latency on the virtual clock, not the wall clock
+    assert exchange.clock.now == pytest.approx(2.0 * (exchange.next_order_id - 1))
+    assert exchange.clock.now > stats['elapsed']
+
+def test_replay_serves_history_then_one_bar_per_request():
+    replay = ReplayMarketData.from_prices({'AAPL': [1.0, 2.0, 3.0, 4.0]}, history=2)
+    assert replay.fetch_initial_data('AAPL', period=30) == ([(1.0, '2021-01-04 09:30:00'), (2.0, '2021-01-04 09:31:00')], [1000, 1000])
+    assert replay.fetch_latest_price('AAPL') == (3.0, '2021-01-04 09:32:00', 1000)
+    assert replay.fetch_latest_price('AAPL') == (4.0, '2021-01-04 09:33:00', 1000)
+    assert replay.exhausted
+    assert replay.fetch_latest_price('AAPL') == (4.0, '2021-01-04 09:33:00', 1000)
+
+def test_rejected_orders_never_become_legs():
+    exchange = SimulatedExchange(reject_rate=1.0, seed=1)
+    bot, replay = build_bot(exchange, random_walks(['AAPL', 'GOOGL'], 150))
+    run_simulated_session(bot, replay)
+    assert exchange.next_order_id > 1
+    assert exchange.fills == []
+    assert all(not info['long'] and not info['short'] for info in bot.stocks_to_check.values())
+
+def test_limit_order_outcomes():
+    exchange = SimulatedExchange(seed=3)
+    exchange.update_price('AAPL', 100.0)
+    alpaca = SimulatedAlpacaClient(exchange)
+
+    filled = alpaca.monitor_order(alpaca.place_order('AAPL', 10, 'BUY', False, limit_price=101.0))
+    assert (filled.status, filled.filled_qty, filled.filled_avg_price) == (OrderStatus.FILLED, 10, 100.0)
+
+    not_crossed = alpaca.monitor_order(alpaca.place_order('AAPL', 10, 'BUY', False, limit_price=99.0))
+    assert (not_crossed.status, not_crossed.filled_qty) == (OrderStatus.CANCELED, 0)
+    assert exchange.positions == {'AAPL': 10}
+
+    sold = alpaca.monitor_order(alpaca.place_order('AAPL', 10, 'SELL', False, limit_price=99.0))
+    assert (sold.status, sold.filled_avg_price) == (OrderStatus.FILLED, 100.0)
+
+def test_slippage_moves_limit_fills_at_the_current_price():
+    exchange = SimulatedExchange(slippage_bps=50, seed=4)
+    exchange.update_price('AAPL', 100.0)
+    alpaca = SimulatedAlpacaClient(exchange)
+    orders = [alpaca.monitor_order(alpaca.place_order('AAPL', 1, side, False, limit_price=100.0)) for side in ['BUY', 'SELL'] * 50]
+    buys = [order.filled_avg_price for order in orders[::2] if order.status == OrderStatus.FILLED]
+    sells = [order.filled_avg_price for order in orders[1::2] if order.status == OrderStatus.FILLED]
+    assert buys and sells
+    assert all(99.5 <= price <= 100.0 for price in buys) and any(price < 100.0 for price in buys)
+    assert all(100.0 <= price <= 100.5 for price in sells) and any(price > 100.0 for price in sells)
+
+def test_partial_fills_leave_remainder_cancelled():
+    exchange = SimulatedExchange(partial_fill_rate=1.0, seed=5)
+    exchange.update_price('AAPL', 100.0)
+    ib = SimulatedIBClient(exchange)
+    trade = ib.place_order('AAPL', 10, 100.0, 'SELL', True)
+    ib.monitor_order(trade)
+    assert trade.orderStatus.status == 'Cancelled'
+    assert 0 < trade.orderStatus.filled < 10
+    assert exchange.positions == {'AAPL': -trade.orderStatus.filled}
+    assert ib.place_order('UNKNOWN', 10, 1.0, 'BUY', True) is None
+
+def test_ib_fills_are_read_from_the_order_status():
+    exchange = SimulatedExchange(slippage_bps=50, seed=6)
+    bot, _ = build_bot(exchange, {'AAPL': [100.0] * 40})
+    bot.trigger_trade('AAPL', 'SELL', 10, 99.0)
+    _, _, action, quantity, price = exchange.fills[0]
+    assert (action, quantity) == ('SELL', 10)
+    assert bot.stocks_to_check['AAPL']['short'] == [{'price': price, 'qty': 10}]
+    # Like an ib_insync Order, the monitored order carries no fill details
+    trade = bot.ib_client.place_order('AAPL', 1, 99.0, 'SELL', True)
+    assert not hasattr(bot.ib_client.monitor_order(trade), 'avgFillPrice')
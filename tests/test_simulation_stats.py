@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from simulation_stats import StreamingStats, P2Quantile, TradeLogWriter, read_trade_log
+from trading_simulation import backtest_prices
+from price_paths import generate_paths
+
+def test_streaming_stats_match_batch_computation():
+    profits = np.random.default_rng(0).normal(0.5, 3.0, 20000)
+    stats = StreamingStats()
+    for profit in profits:
+        stats.add(profit)
+
+    equity = np.cumsum(profits)
+    drawdown = np.max(np.maximum.accumulate(np.maximum(equity, 0)) - equity)
+    assert stats.count == 20000
+    assert stats.mean == pytest.approx(profits.mean())
+    assert stats.variance == pytest.approx(profits.var(ddof=1))
+    assert (stats.min, stats.max) == (profits.min(), profits.max())
+    assert stats.win_rate == pytest.approx(np.mean(profits > 0))
+    assert stats.max_drawdown == pytest.approx(drawdown)
+    for q in (0.05, 0.5, 0.95):
+        assert stats.quantile(q) == pytest.approx(np.quantile(profits, q), abs=0.1)
+
+def test_quantile_falls_back_to_exact_for_few_samples():
+    estimator = P2Quantile(0.5)
+    for value in [3.0, 1.0, 2.0]:
+        estimator.add(value)
+    assert estimator.value() == 2.0
+
+def test_empty_stats_summary():
+    summary = StreamingStats().summary()
+    assert summary['count'] == 0
+    assert summary['win_rate'] == 0.0
+    assert np.isnan(summary['p50'])
+
+def test_trade_log_round_trip(tmp_path):
+    with TradeLogWriter(str(tmp_path), buffer_size=4) as log:
+        for i in range(10):
+            log.write(i // 3, i, i + 5, i % 5 + 1, i * 0.5)
+
+    columns = read_trade_log(str(tmp_path))
+    assert list(columns['run_id']) == [i // 3 for i in range(10)]
+    assert list(columns['exit_step'] - columns['entry_step']) == [5] * 10
+    assert list(columns['legs']) == [i % 5 + 1 for i in range(10)]
+    assert list(columns['profit']) == [i * 0.5 for i in range(10)]
+
+def test_backtest_reports_each_closed_trade():
+    trades = []
+    prices = generate_paths(1, 2000, seed=2)[0]
+    # Streamed trades are not also collected
+    assert backtest_prices(prices, on_trade=lambda *trade: trades.append(trade)) is None
+    results = backtest_prices(prices)
+    assert results and [profit for *_, profit in trades] == results
+    for entry_step, exit_step, legs, _ in trades:
+        assert entry_step < exit_step and 1 <= legs <= 5
@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import requests
+from soak_test import FakeMarketDataServer, FakeMarketDataProcess, run_soak, deep_sizeof
+
+def test_fake_server_serves_alpha_vantage_payloads():
+    server = FakeMarketDataServer(history=5).start()
+    try:
+        daily = requests.get(server.url, params={'function': 'TIME_SERIES_DAILY', 'symbol': 'T00001'}).json()
+        assert len(daily['Time Series (Daily)']) == 5
+        first = requests.get(server.url, params={'function': 'TIME_SERIES_INTRADAY', 'symbol': 'T00001'}).json()
+        second = requests.get(server.url, params={'function': 'TIME_SERIES_INTRADAY', 'symbol': 'T00001'}).json()
+        assert max(first['Time Series (1min)']) < max(second['Time Series (1min)'])
+    finally:
+        server.stop()
+
+def test_fake_server_runs_in_child_process():
+    server = FakeMarketDataProcess(history=3).start()
+    try:
+        assert server._process.pid != os.getpid()
+        daily = requests.get(server.url, params={'function': 'TIME_SERIES_DAILY', 'symbol': 'T00001'}).json()
+        assert len(daily['Time Series (Daily)']) == 3
+    finally:
+        server.stop()
+    assert server.requests == 1
+
+def test_soak_report():
+    report = run_soak(num_symbols=20, cycles=3, report_every=0)
+    assert report['requests'] >= 20 + 3 * 20
+    assert set(report['cycle_seconds']) == {'p50', 'p90', 'p99', 'max', 'first'}
+    assert report['cycle_seconds']['p50'] <= report['cycle_seconds']['max']
+    assert report['peak_rss_bytes'] >= report['rss_bytes']['final'] > 0
+    assert report['state_bytes_per_symbol'] > 0
+    # Prices reach the simulated exchange even though the server runs in another process
+    assert run_soak(num_symbols=5, cycles=40, report_every=0)['fills'] > 0
+
+def test_deep_sizeof_counts_shared_objects_once():
+    shared = list(range(100))
+    assert deep_sizeof({'a': shared, 'b': shared}) < deep_sizeof({'a': shared, 'b': list(range(100))})
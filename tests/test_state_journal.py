@@ -0,0 +1,96 @@
+import sys
+import os
+import time
+import random
+import signal
+import subprocess
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import pytest
+from state_journal import StateJournal, apply_record
+
+SYMBOLS = ['AAPL', 'GOOGL', 'TSLA']
+
+def generate_ops(seed, count):
+    """Deterministic stream of journal operations shaped like the bot's real mutations."""
+    rng = random.Random(seed)
+    fetched = {symbol: False for symbol in SYMBOLS}
+    for step in range(count):
+        symbol = rng.choice(SYMBOLS)
+        if not fetched[symbol]:
+            fetched[symbol] = True
+            yield 'fetch', symbol, {'prices': [round(rng.uniform(90, 110), 2) for _ in range(5)],
+                                    'timestamps': [f't{step}-{i}' for i in range(5)],
+                                    'volumes': [rng.randint(100, 1000) for _ in range(5)],
+                                    'previous_rsi': rng.uniform(0, 100)}
+            continue
+        op = rng.choice(['bar', 'bar', 'bar', 'rsi', 'fill', 'reset'])
+        if op == 'bar':
+            yield 'bar', symbol, {'price': round(rng.uniform(90, 110), 2), 'timestamp': f't{step}', 'volume': rng.randint(100, 1000)}
+        elif op == 'rsi':
+            yield 'rsi', symbol, {'previous_rsi': rng.uniform(0, 100)}
+        elif op == 'fill':
+            yield 'fill', symbol, {'side': rng.choice(['long', 'short']), 'price': round(rng.uniform(90, 110), 2), 'qty': 10}
+        else:
+            fetched[symbol] = False
+            yield 'reset', symbol, {}
+
+def reference_state(seed, count):
+    state = {}
+    for seq, (op, symbol, fields) in enumerate(generate_ops(seed, count), start=1):
+        apply_record(state, {'seq': seq, 'op': op, 'symbol': symbol, **fields})
+    return state
+
+def write_ops(directory, seed, count, snapshot_every):
+    journal = StateJournal(directory, snapshot_every=snapshot_every)
+    state = journal.recover()
+    journal.attach(state)
+    for op, symbol, fields in generate_ops(seed, count):
+        apply_record(state, {'op': op, 'symbol': symbol, **fields})
+        journal.record(op, symbol, **fields)
+    journal.close()
+    return state
+
+def test_recovers_from_snapshot_and_journal_tail(tmp_path):
+    state = write_ops(str(tmp_path), seed=1, count=537, snapshot_every=100)
+    journal = StateJournal(str(tmp_path))
+    recovered = journal.recover()
+    assert journal.seq == 537
+    assert recovered == state == reference_state(1, 537)
+    journal.close()
+
+def test_ignores_torn_tail_record(tmp_path):
+    write_ops(str(tmp_path), seed=2, count=20, snapshot_every=0)
+    with open(tmp_path / 'journal.jsonl', 'a') as f:
+        f.write('{"seq":21,"op":"bar","symbol":"AA')
+
+    journal = StateJournal(str(tmp_path))
+    assert journal.recover() == reference_state(2, 20)
+    # Appending after recovery must not land behind the torn bytes
+    journal.record('reset', 'AAPL')
+    journal.close()
+    expected = reference_state(2, 20)
+    apply_record(expected, {'op': 'reset', 'symbol': 'AAPL'})
+    assert StateJournal(str(tmp_path)).recover() == expected
+
+@pytest.mark.parametrize('seed', range(5))
+def test_recovers_after_kill_at_random_point(tmp_path, seed):
+    child = subprocess.Popen([sys.executable, __file__, str(tmp_path), str(seed)], stdout=subprocess.PIPE)
+    assert child.stdout.readline() == b'ready\n'
+    time.sleep(random.Random(seed).uniform(0.05, 0.5))
+    child.send_signal(signal.SIGKILL)
+    child.wait()
+
+    journal = StateJournal(str(tmp_path))
+    started = time.perf_counter()
+    recovered = journal.recover()
+    elapsed = time.perf_counter() - started
+    journal.close()
+    assert journal.seq > 0
+    assert recovered == reference_state(seed, journal.seq)
+    assert elapsed < 1
+
+if __name__ == '__main__':
+    # Child process for the kill test: journal operations until killed
+    directory, seed = sys.argv[1], int(sys.argv[2])
+    print('ready', flush=True)
+    write_ops(directory, seed, count=10_000_000, snapshot_every=500)
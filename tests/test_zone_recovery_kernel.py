@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import numpy as np
+import pytest
+from price_paths import SimpleRandomWalk, GeometricBrownianMotion, JumpDiffusion, GarchVolatility, generate_paths
+from trading_simulation import backtest_prices
+from zone_recovery_logic import ZoneRecoveryLogic
+from zone_recovery_kernel import run_kernel, kernel_backtest, BUY, SELL, CLOSE_ALL
+
+MODELS = [SimpleRandomWalk(), GeometricBrownianMotion(), JumpDiffusion(), GarchVolatility()]
+LOGICS = [
+    ZoneRecoveryLogic(),
+    ZoneRecoveryLogic(rsi_period=5, entry_rsi_low=40, entry_rsi_high=60, profit_target=1, max_trades=3, loss_threshold=0.5),
+    ZoneRecoveryLogic(rsi_period=30, max_trades=8, loss_threshold=3),
+]
+
+def trades_of(backtest, prices, logic, window):
+    trades = []
+    profits = backtest(prices, ZoneRecoveryLogic(**vars(logic)), window=window, on_trade=lambda *trade: trades.append(trade))
+    return profits, trades
+
+@pytest.mark.parametrize('model', MODELS, ids=lambda model: type(model).__name__)
+@pytest.mark.parametrize('logic', LOGICS, ids=['default', 'tight', 'slow'])
+@pytest.mark.parametrize('window', [None, 30])
+def test_matches_python_logic_on_random_paths(model, logic, window):
+    rng = np.random.default_rng([MODELS.index(model), LOGICS.index(logic), window or 0])
+    for prices in generate_paths(3, int(rng.integers(100, 250)), model, initial_price=float(rng.uniform(1, 500)), seed=rng):
+        expected_profits, expected_trades = trades_of(backtest_prices, prices, logic, window)
+        profits, trades = trades_of(kernel_backtest, prices, logic, window)
+        assert trades == expected_trades
+        assert profits is expected_profits is None
+        assert kernel_backtest(prices, ZoneRecoveryLogic(**vars(logic)), window=window) == [profit for *_, profit in trades]
+
+def test_actions_record_every_decision():
+    prices = generate_paths(1, 500, seed=3)[0]
+    decisions = []
+
+    class RecordingLogic(ZoneRecoveryLogic):
+        def calculate_rsi_and_check_profit(self, stock_data, stock, current_price, prices=None):
+            result = super().calculate_rsi_and_check_profit(stock_data, stock, current_price, prices)
+            decisions.append({'BUY': BUY, 'SELL': SELL, 'CLOSE_ALL': CLOSE_ALL}[result[0]] if result else 0)
+            return result
+
+    backtest_prices(prices, RecordingLogic())
+    actions, trades = run_kernel(prices)
+    assert actions.tolist() == decisions
+    assert len(trades['profit']) == decisions.count(CLOSE_ALL) > 0
+
+def test_empty_and_short_series():
+    actions, trades = run_kernel([])
+    assert len(actions) == 0 and len(trades['profit']) == 0
+    assert kernel_backtest([100.0, 101.0]) == []
@@ -1,30 +1,56 @@
+import argparse
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 from zone_recovery_logic import ZoneRecoveryLogic
+from market_data_store import BarStore
+from simulation_stats import StreamingStats, TradeLogWriter, read_trade_log
+from log_setup import configure_logging
+from zone_recovery_kernel import kernel_backtest
+from price_paths import generate_paths, SimpleRandomWalk, GeometricBrownianMotion, JumpDiffusion, GarchVolatility
 
-def simulate_stock_price(days, initial_price=100, volatility=1):
+PATH_CHUNK_SIZE = 1000
+
+PRICE_MODELS = {
+    'walk': SimpleRandomWalk,
+    'gbm': GeometricBrownianMotion,
+    'jump': JumpDiffusion,
+    'garch': GarchVolatility,
+}
+
+def simulate_stock_price(days, initial_price=100, volatility=0.01, seed=None):
     """ Generate a synthetic stock price series based on random walk theory. """
-    prices = [initial_price]
-    for _ in range(1, days):
-        prices.append(prices[-1] * (1 + np.random.normal(0, volatility)))
-    return prices
-
-def run_simulation(days=250, initial_price=100):
-    stock_prices = simulate_stock_price(days, initial_price)
-    trading_bot = ZoneRecoveryLogic()
+    return generate_paths(1, days, SimpleRandomWalk(volatility), initial_price, seed)[0].tolist()
+
+def backtest_prices(stock_prices, trading_bot=None, window=None, symbol='SYNTH', on_trade=None):
+    """Run the zone recovery logic over a price series and return the profit of every closed trade.
+
+    With ``window`` set, only the most recent ``window`` prices feed the RSI, like the live bot's
+    fixed-size history; otherwise prices accumulate until positions are closed. With ``on_trade``,
+    every closed trade is only streamed to ``on_trade(entry_step, exit_step, legs, profit)`` and
+    None is returned, so long runs keep constant memory.
+    """
+    trading_bot = trading_bot or ZoneRecoveryLogic()
     stock_data = {'long': [], 'short': [], 'prices': []}
+    entry_step = None
 
-    results = []
-    for current_price in stock_prices:
+    results = None if on_trade else []
+    for step, current_price in enumerate(stock_prices):
+        current_price = float(current_price)
         stock_data['prices'].append(current_price)  # Update prices data for RSI calculation
-        result = trading_bot.calculate_rsi_and_check_profit(stock_data, 'SYNTH', current_price)
+        if window and len(stock_data['prices']) > window:
+            stock_data['prices'].pop(0)
+        result = trading_bot.calculate_rsi_and_check_profit(stock_data, symbol, current_price)
         if result:
             action, price, profit = result
             if action == "CLOSE_ALL":
-                results.append(profit)
+                if on_trade:
+                    on_trade(entry_step, step, len(stock_data['long']) + len(stock_data['short']), profit)
+                else:
+                    results.append(profit)
                 stock_data = {'long': [], 'short': [], 'prices': []}  # reset positions and prices
+                entry_step = None
             elif action in ["BUY", "SELL"]:
+                if entry_step is None:
+                    entry_step = step
                 if action == "BUY":
                     stock_data['long'].append({'price': current_price, 'qty': 1})
                 else:
@@ -32,22 +58,81 @@ def run_simulation(days=250, initial_price=100):
 
     return results
 
-# Run the simulation 100 times and calculate the average profit
-num_runs = 1000
-all_profits = []
-for _ in range(num_runs):
-    profits = run_simulation()
-    all_profits.extend(profits)
-
-if all_profits:
-    average_profit = np.mean(all_profits)
-    print(f"Average Profit over {num_runs} Simulated Periods: {average_profit:.2f}%")
-    plt.plot(all_profits)
-    plt.title('Profit per Trade Across All Simulations')
-    plt.xlabel('Trade Number')
-    plt.ylabel('Profit (%)')
-    plt.show()
-else:
-    print("No trades were executed during any of the simulations.")
+def run_simulation(days=250, initial_price=100, seed=None):
+    stock_prices = simulate_stock_price(days, initial_price, seed=seed)
+    return backtest_prices(stock_prices)
+
+def run_replay_backtest(store, symbols=None, interval='1min', window=30):
+    """Backtest every symbol in a BarStore over its memory-mapped closes, in sorted symbol order."""
+    symbols = sorted(symbols or store.symbols(interval))
+    return {symbol: backtest_prices(store.load(symbol, interval).closes, window=window, symbol=symbol) for symbol in symbols}
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the zone recovery logic on synthetic or recorded prices.')
+    parser.add_argument('--runs', type=int, default=1000, help='Number of synthetic price paths to simulate')
+    parser.add_argument('--days', type=int, default=250, help='Length of each synthetic price path')
+    parser.add_argument('--model', choices=sorted(PRICE_MODELS), default='walk', help='Price model for synthetic paths')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for reproducible synthetic paths')
+    parser.add_argument('--replay', default=None, metavar='DIR', help='Backtest bars recorded or imported into DIR instead')
+    parser.add_argument('--interval', default='1min', help='Bar interval to replay from DIR')
+    parser.add_argument('--symbols', nargs='*', default=None, help='Symbols to replay (default: all in DIR)')
+    parser.add_argument('--trade-log', default=None, metavar='DIR', help='Write a columnar per-trade log to DIR')
+    parser.add_argument('--kernel', action='store_true',
+                        help='Replay with the compiled zone recovery kernel instead of the Python logic')
+    parser.add_argument('--plot', action='store_true', help='Plot profit per trade from the trade log')
+    parser.add_argument('--import-csv', nargs=2, action='append', default=[], metavar=('SYMBOL', 'CSV'),
+                        help='Import a CSV history for SYMBOL into DIR before replaying')
+    args = parser.parse_args()
+    configure_logging()
+    if args.plot and not args.trade_log:
+        parser.error('--plot reads profits back from the trade log, so it requires --trade-log')
+
+    stats = StreamingStats()
+    trade_log = TradeLogWriter(args.trade_log) if args.trade_log else None
+
+    def run_backtest(run_id, stock_prices, **kwargs):
+        def on_trade(entry_step, exit_step, legs, profit):
+            stats.add(profit)
+            if trade_log:
+                trade_log.write(run_id, entry_step, exit_step, legs, profit)
+        backtest = kernel_backtest if args.kernel else backtest_prices
+        backtest(stock_prices, on_trade=on_trade, **kwargs)
+
+    if args.replay:
+        store = BarStore(args.replay)
+        for symbol, path in args.import_csv:
+            store.import_csv(path, symbol, args.interval)
+        symbols = sorted(args.symbols or store.symbols(args.interval))
+        for run_id, symbol in enumerate(symbols):
+            run_backtest(run_id, store.load(symbol, args.interval).closes, window=30, symbol=symbol)
+        label = f"{len(symbols)} Replayed Symbols"
+    else:
+        # Generate paths in fixed-size chunks into one reused buffer and stream every trade into the statistics
+        model = PRICE_MODELS[args.model]()
+        rng = np.random.default_rng(args.seed)
+        buffer = np.empty((min(PATH_CHUNK_SIZE, args.runs), args.days))
+        for chunk_start in range(0, args.runs, PATH_CHUNK_SIZE):
+            chunk = min(PATH_CHUNK_SIZE, args.runs - chunk_start)
+            paths = generate_paths(chunk, args.days, model, seed=rng, out=buffer[:chunk])
+            for offset, stock_prices in enumerate(paths):
+                run_backtest(chunk_start + offset, stock_prices)
+        label = f"{args.runs} Simulated Periods"
+    if trade_log:
+        trade_log.close()
 
+    if stats.count:
+        summary = stats.summary()
+        print(f"Average Profit over {label}: {summary['mean']:.2f}%")
+        print(", ".join(f"{name}: {value:.4g}" for name, value in summary.items()))
+        if args.plot:
+            import matplotlib.pyplot as plt  # Only needed for the interactive plot
+            plt.plot(read_trade_log(args.trade_log)['profit'])
+            plt.title('Profit per Trade Across All Simulations')
+            plt.xlabel('Trade Number')
+            plt.ylabel('Profit (%)')
+            plt.show()
+    else:
+        print("No trades were executed during any of the simulations.")
 
+if __name__ == "__main__":
+    main()
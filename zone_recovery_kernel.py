@@ -0,0 +1,197 @@
+import numpy as np
+from zone_recovery_logic import ZoneRecoveryLogic
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional; the kernel then runs as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+NO_ACTION, BUY, SELL, CLOSE_ALL = 0, 1, 2, 3
+
+
+@njit(cache=True)
+def _ewm_update(weighted, value, alpha):
+    # Same arithmetic as pandas' ewm(alpha=..., adjust=False).mean(), which the ta RSI uses
+    old_weight = 1.0 - alpha
+    if weighted != value:
+        weighted = (old_weight * weighted + alpha * value) / (old_weight + alpha)
+    return weighted
+
+
+@njit(cache=True)
+def _rsi_from_averages(up, down):
+    if down == 0.0:
+        return 100.0
+    return 100.0 - 100.0 / (1.0 + up / down)
+
+
+@njit(cache=True)
+def _window_rsi(buffer, head, count, period):
+    """RSI over the ``count`` prices in the ring buffer starting at ``head``, recomputed from scratch."""
+    if count < period:
+        return np.nan
+    size = buffer.shape[0]
+    alpha = 1.0 / period
+    up = 0.0
+    down = 0.0
+    previous = buffer[head]
+    for k in range(1, count):
+        price = buffer[(head + k) % size]
+        diff = price - previous
+        up = _ewm_update(up, diff if diff > 0.0 else 0.0, alpha)
+        down = _ewm_update(down, -diff if diff < 0.0 else 0.0, alpha)
+        previous = price
+    return _rsi_from_averages(up, down)
+
+
+@njit(cache=True)
+def _percentage_profit(long_prices, num_long, short_prices, num_short, qty, current_price):
+    long_initial = 0.0
+    long_profit = 0.0
+    for i in range(num_long):
+        long_initial += long_prices[i] * qty
+        long_profit += (current_price - long_prices[i]) * qty
+    short_initial = 0.0
+    short_profit = 0.0
+    for i in range(num_short):
+        short_initial += short_prices[i] * qty
+        short_profit += (short_prices[i] - current_price) * qty
+    total_initial = long_initial + short_initial
+    if total_initial == 0.0:
+        return 0.0
+    return (long_profit + short_profit) / total_initial * 100
+
+
+@njit(cache=True)
+def zone_recovery_kernel(prices, rsi_period, entry_rsi_low, entry_rsi_high, profit_target, max_trades, loss_threshold,
+                         window, qty, actions, entry_steps, exit_steps, legs, profits):
+    """Replay ``prices`` tick by tick through the rules of ZoneRecoveryLogic.calculate_rsi_and_check_profit.
+
+    Follows backtest_prices: every signal opens a ``qty`` leg at the current price and CLOSE_ALL
+    clears the legs and the RSI history. ``window`` > 0 limits the RSI to the most recent prices,
+    otherwise the RSI is updated incrementally. Fills ``actions`` per tick and one entry of
+    ``entry_steps``, ``exit_steps``, ``legs`` and ``profits`` per closed trade, and returns the
+    number of closed trades.
+    """
+    alpha = 1.0 / rsi_period
+    long_prices = np.empty(max(max_trades, 1))
+    short_prices = np.empty(max(max_trades, 1))
+    buffer = np.empty(max(window, 1))
+    num_long = 0
+    num_short = 0
+    num_trades = 0
+    entry_step = -1
+
+    # RSI state since the last reset
+    count = 0
+    head = 0
+    last_price = 0.0
+    up = 0.0
+    down = 0.0
+    previous_rsi = np.nan
+    has_previous_rsi = False
+
+    for step in range(prices.shape[0]):
+        current_price = prices[step]
+        if window > 0:
+            if count < window:
+                buffer[(head + count) % window] = current_price
+                count += 1
+            else:
+                buffer[head] = current_price
+                head = (head + 1) % window
+            rsi = _window_rsi(buffer, head, count, rsi_period)
+        else:
+            if count > 0:
+                diff = current_price - last_price
+                up = _ewm_update(up, diff if diff > 0.0 else 0.0, alpha)
+                down = _ewm_update(down, -diff if diff < 0.0 else 0.0, alpha)
+            last_price = current_price
+            count += 1
+            rsi = _rsi_from_averages(up, down) if count >= rsi_period else np.nan
+
+        total_profit = _percentage_profit(long_prices, num_long, short_prices, num_short, qty, current_price)
+        long_loss = -_percentage_profit(long_prices, num_long, short_prices, 0, qty, current_price)
+        short_loss = -_percentage_profit(long_prices, 0, short_prices, num_short, qty, current_price)
+
+        action = NO_ACTION
+        if total_profit >= profit_target or num_long + num_short >= max_trades:
+            action = CLOSE_ALL
+        elif long_loss > loss_threshold or short_loss > loss_threshold:
+            action = SELL if long_loss > short_loss else BUY
+        elif has_previous_rsi:
+            if rsi < entry_rsi_low and previous_rsi < rsi:
+                action = BUY
+            elif rsi > entry_rsi_high and previous_rsi > rsi:
+                action = SELL
+        previous_rsi = rsi
+        has_previous_rsi = True
+        actions[step] = action
+
+        if action == CLOSE_ALL:
+            entry_steps[num_trades] = entry_step
+            exit_steps[num_trades] = step
+            legs[num_trades] = num_long + num_short
+            profits[num_trades] = total_profit
+            num_trades += 1
+            num_long = 0
+            num_short = 0
+            entry_step = -1
+            count = 0
+            head = 0
+            up = 0.0
+            down = 0.0
+            has_previous_rsi = False
+        elif action != NO_ACTION:
+            if entry_step < 0:
+                entry_step = step
+            if action == BUY:
+                long_prices[num_long] = current_price
+                num_long += 1
+            else:
+                short_prices[num_short] = current_price
+                num_short += 1
+    return num_trades
+
+
+def run_kernel(stock_prices, trading_bot=None, window=None, qty=1):
+    """Run the kernel over one price series; returns ``(actions, trades)``.
+
+    ``actions`` holds NO_ACTION, BUY, SELL or CLOSE_ALL per tick and ``trades`` is a dict of
+    ``entry_step``, ``exit_step``, ``legs`` and ``profit`` arrays, one entry per closed trade
+    (``entry_step`` is -1 for a close without legs).
+    """
+    trading_bot = trading_bot or ZoneRecoveryLogic()
+    prices = np.ascontiguousarray(stock_prices, dtype=np.float64)
+    n = prices.shape[0]
+    actions = np.zeros(n, dtype=np.int8)
+    entry_steps = np.empty(n, dtype=np.int64)
+    exit_steps = np.empty(n, dtype=np.int64)
+    legs = np.empty(n, dtype=np.int64)
+    profits = np.empty(n, dtype=np.float64)
+    num_trades = zone_recovery_kernel(prices, trading_bot.rsi_period, float(trading_bot.entry_rsi_low), float(trading_bot.entry_rsi_high),
+                                      float(trading_bot.profit_target), trading_bot.max_trades, float(trading_bot.loss_threshold),
+                                      window or 0, float(qty), actions, entry_steps, exit_steps, legs, profits)
+    trades = {'entry_step': entry_steps[:num_trades], 'exit_step': exit_steps[:num_trades],
+              'legs': legs[:num_trades], 'profit': profits[:num_trades]}
+    return actions, trades
+
+
+def kernel_backtest(stock_prices, trading_bot=None, window=None, symbol='SYNTH', on_trade=None):
+    """Drop-in replacement for trading_simulation.backtest_prices backed by the kernel.
+
+    ``symbol`` is accepted for compatibility only; the kernel does not log decisions. As there,
+    trades are only streamed to ``on_trade`` when it is given and None is returned.
+    """
+    _, trades = run_kernel(stock_prices, trading_bot, window)
+    if not on_trade:
+        return trades['profit'].tolist()
+    for entry_step, exit_step, legs, profit in zip(trades['entry_step'].tolist(), trades['exit_step'].tolist(),
+                                                   trades['legs'].tolist(), trades['profit'].tolist()):
+        on_trade(entry_step if entry_step >= 0 else None, exit_step, legs, profit)
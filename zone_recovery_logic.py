@@ -2,21 +2,20 @@ import numpy as np
 import logging
 from utils import calculate_rsi
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 class ZoneRecoveryLogic:
-    def __init__(self, rsi_period=14, entry_rsi_low=30, entry_rsi_high=70, profit_target=5, max_trades=5, loss_threshold=1.5):
+    def __init__(self, rsi_period=14, entry_rsi_low=30, entry_rsi_high=70, profit_target=5, max_trades=5, loss_threshold=1.5, timeframe=None):
         self.rsi_period = rsi_period
         self.entry_rsi_low = entry_rsi_low
         self.entry_rsi_high = entry_rsi_high
         self.profit_target = profit_target
         self.max_trades = max_trades
         self.loss_threshold = loss_threshold
+        self.timeframe = timeframe  # Bar timeframe the RSI runs on; None uses the raw price history
 
-    def calculate_rsi_and_check_profit(self, stock_data, stock, current_price):
-        prices = np.array(stock_data["prices"])
-        rsi = calculate_rsi(prices, self.rsi_period)
+    def calculate_rsi_and_check_profit(self, stock_data, stock, current_price, prices=None):
+        prices = np.array(stock_data["prices"] if prices is None else prices)
+        # Too short a series (e.g. a timeframe with few aggregated bars yet) has no RSI
+        rsi = calculate_rsi(prices, self.rsi_period) if len(prices) >= self.rsi_period else np.nan
 
         previous_rsi = stock_data.get('previous_rsi')
         stock_data['previous_rsi'] = rsi
@@ -29,23 +28,23 @@ class ZoneRecoveryLogic:
         # Check if profit target is reached to close all positions
         trade_count = len(stock_data['long']) + len(stock_data['short'])
         if total_profit >= self.profit_target or trade_count >= self.max_trades:
-            logging.info(f"{stock}: Closing all positions due to reaching the profit target or max trades. Current profit: {total_profit}%.")
+            logging.info("%s: Closing all positions due to reaching the profit target or max trades. Current profit: %s%%.", stock, total_profit)
             return "CLOSE_ALL", current_price, total_profit
 
         if long_loss > self.loss_threshold or short_loss > self.loss_threshold:
             if long_loss > short_loss:
-                logging.info(f"{stock}: Long positions showing greater loss at {long_loss}%. Hedging by opening a SHORT position at {current_price}.")
+                logging.info("%s: Long positions showing greater loss at %s%%. Hedging by opening a SHORT position at %s.", stock, long_loss, current_price)
                 return "SELL", current_price, total_profit
             else:
-                logging.info(f"{stock}: Short positions showing greater loss at {short_loss}%. Hedging by opening a LONG position at {current_price}.")
+                logging.info("%s: Short positions showing greater loss at %s%%. Hedging by opening a LONG position at %s.", stock, short_loss, current_price)
                 return "BUY", current_price, total_profit
 
         if previous_rsi is not None:
             if rsi < self.entry_rsi_low and previous_rsi < rsi:
-                logging.info(f"{stock}: RSI increasing from oversold ({previous_rsi} to {rsi}), triggered BUY at price {current_price}")
+                logging.info("%s: RSI increasing from oversold (%s to %s), triggered BUY at price %s", stock, previous_rsi, rsi, current_price)
                 return "BUY", current_price, total_profit
             elif rsi > self.entry_rsi_high and previous_rsi > rsi:
-                logging.info(f"{stock}: RSI decreasing from overbought ({previous_rsi} to {rsi}), triggered SELL at price {current_price}")
+                logging.info("%s: RSI decreasing from overbought (%s to %s), triggered SELL at price %s", stock, previous_rsi, rsi, current_price)
                 return "SELL", current_price, total_profit
         return None
 